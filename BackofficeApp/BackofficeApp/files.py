@@ -0,0 +1,100 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+def delete_files_from_storage(file_names):
+    """
+    Deletes files from the S3 storage with batched `DeleteObjects` requests instead of a request per file. <br>
+    Empty names are skipped.
+
+    Args:
+        file_names (list): Names of the files in the storage.
+    """
+    keys = [{'Key': name} for name in file_names if name]
+    for i in range(0, len(keys), 1000):
+        default_storage.bucket.delete_objects(Delete={'Objects': keys[i:i + 1000], 'Quiet': True})
+
+
+def update_fields_except(instance, preserved_fields):
+    """
+    Names of the fields to write on update, leaving out fields whose value is kept as it is in the database.
+
+    Args:
+        instance (Model): The model instance being saved.
+        preserved_fields (list): Names of the fields that shouldn't be written.
+
+    Returns:
+        (list): Names of the concrete non primary key fields except the preserved ones.
+    """
+    return [
+        field.name for field in instance._meta.concrete_fields 
+        if not field.primary_key and field.name not in preserved_fields
+    ]
+
+
+def remember_file_names(instance, field_names):
+    """
+    Remembers names of the files stored in the database for the loaded file fields of the instance,
+        so `save` can compare files without reading the row again. <br>
+    Called when the instance is loaded from the database and after it's file fields are saved.
+
+    Args:
+        instance (Model): The model instance.
+        field_names (list): Names of the file fields.
+    """
+    loaded_files = instance.__dict__.setdefault('_loaded_files', {})
+    for name in field_names:
+        if name in instance.__dict__:
+            value = instance.__dict__[name]
+            loaded_files[name] = getattr(value, 'name', value) or None
+
+
+def stored_file_names(instance, field_names):
+    """
+    Names of the files stored in the database for the file fields of the instance. <br>
+    Names remembered on load are used, the row is read only for fields that weren't loaded.
+
+    Args:
+        instance (Model): The model instance being saved.
+        field_names (list): Names of the file fields.
+
+    Returns:
+        (dict): Field name to the stored file name, None if the field is empty.
+    """
+    loaded_files = instance.__dict__.get('_loaded_files', {})
+    file_names = {name: loaded_files[name] for name in field_names if name in loaded_files}
+    not_loaded = [name for name in field_names if name not in loaded_files]
+    if not_loaded:
+        row = type(instance)._base_manager.filter(pk=instance.pk).values(*not_loaded).first() or {}
+        file_names.update({name: row.get(name) or None for name in not_loaded})
+    return file_names
+
+
+_storage_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='storage-delete')
+
+
+def _delete_files_in_background(file_names):
+    try:
+        delete_files_from_storage(file_names)
+    except Exception:
+        # nobody waits for the background thread, the error with it's traceback goes to the log
+        logger.exception("Error deleting files from S3: %s", file_names)
+
+
+def delete_files_on_commit(file_names):
+    """
+    Schedules deletion of files from the storage after the current transaction is committed. <br>
+    Deletion runs in a background thread, so the request doesn't wait for S3 
+        and files are kept if the transaction is rolled back.
+
+    Args:
+        file_names (list): Names of the files in the storage.
+    """
+    file_names = [name for name in file_names if name]
+    if file_names:
+        transaction.on_commit(lambda: _storage_executor.submit(_delete_files_in_background, file_names))
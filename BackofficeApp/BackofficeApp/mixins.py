@@ -0,0 +1,133 @@
+from rest_framework import serializers
+
+
+_related_lookups = {}
+
+
+def get_relation(model, attr):
+    """
+    Finds the relation of the model that is accessible as the attribute. <br>
+    Reverse relations are matched by their accessor (`related_name`), the name used by serializers and eager loading.
+
+    Args:
+        model (Model): Model to look in.
+        attr (str): Attribute name.
+
+    Returns:
+        (Field | ForeignObjectRel | None): The relation, None if the attribute isn't a relation.
+    """
+    for field in model._meta.get_fields():
+        if not field.is_relation:
+            continue
+        if field.concrete or not field.auto_created:
+            if field.name == attr:
+                return field
+        elif field.get_accessor_name() == attr:
+            return field
+    return None
+
+
+def collect_related_lookups(serializer, model, prefix='', in_prefetch=False, select=None, prefetch=None):
+    """
+    Walks the readable fields of a serializer and collects the relations they read. <br>
+    Nested serializers and fields with dotted sources are followed through the model relations. <br>
+    Single relations become `select_related` lookups, to-many relations and everything under them
+        become `prefetch_related` lookups. <br>
+    Single `PrimaryKeyRelatedField` on a foreign key is skipped, it reads the id from the row itself.
+    Relations used only inside custom `to_representation` methods can't be seen and have to be added by hand.
+
+    Args:
+        serializer (Serializer): Bound serializer instance to walk.
+        model (Model): Model serialized by the serializer.
+        prefix (str): Lookup path of the serializer from the root model.
+        in_prefetch (bool): True if the serializer is under a prefetched relation.
+        select (list): Collected `select_related` lookups.
+        prefetch (list): Collected `prefetch_related` lookups.
+
+    Returns:
+        (tuple): Lists of `select_related` and `prefetch_related` lookups.
+    """
+    select = [] if select is None else select
+    prefetch = [] if prefetch is None else prefetch
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+
+        relations = []
+        current_model = model
+        for attr in field.source_attrs:
+            relation = get_relation(current_model, attr)
+            if relation is None:
+                break
+            relations.append(relation)
+            current_model = relation.related_model
+
+        if not relations:
+            continue
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and len(relations) == 1 and relations[0].concrete:
+            continue
+
+        lookup = prefix + '__'.join(field.source_attrs[:len(relations)])
+        is_prefetch = in_prefetch or any(relation.many_to_many or relation.one_to_many for relation in relations)
+        (prefetch if is_prefetch else select).append(lookup)
+
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(nested, serializers.BaseSerializer):
+            collect_related_lookups(nested, current_model, lookup + '__', is_prefetch, select, prefetch)
+
+    return select, prefetch
+
+
+def get_related_lookups(serializer_class):
+    """
+    Returns `select_related` and `prefetch_related` lookups for the serializer class,
+        collected on the first call and cached per class.
+
+    Args:
+        serializer_class (ModelSerializer): Serializer class to inspect.
+
+    Returns:
+        (tuple): Lists of `select_related` and `prefetch_related` lookups.
+    """
+    if serializer_class not in _related_lookups:
+        _related_lookups[serializer_class] = collect_related_lookups(serializer_class(), serializer_class.Meta.model)
+    return _related_lookups[serializer_class]
+
+
+class AutoPrefetchMixin:
+    """
+    Viewset mixin that eager loads the relations read by the serializer of the action. <br>
+    Lookups are derived from the serializer fields, so relations added to serializers
+        don't turn into a query per row. <br>
+    Only actions that serialize the loaded instances get them, 
+        `update` reloads relations after the save and `destroy` serializes nothing.
+
+    Attributes:
+        auto_prefetch_actions (tuple): Actions the derived lookups are applied to.
+
+    Methods:
+        filter_queryset: Applies the derived `select_related` and `prefetch_related` to the filtered queryset.
+    """
+    auto_prefetch_actions = ('list', 'retrieve')
+
+    def filter_queryset(self, queryset):
+        """
+        Applies the `select_related` and `prefetch_related` lookups derived from the serializer class of the action,
+            if the action is one of `auto_prefetch_actions`.
+
+        Args:
+            queryset (QuerySet): Queryset from `get_queryset`.
+
+        Returns:
+            (QuerySet): Filtered queryset with eager loaded relations.
+        """
+        queryset = super().filter_queryset(queryset)
+        if self.action not in self.auto_prefetch_actions:
+            return queryset
+        select, prefetch = get_related_lookups(self.get_serializer_class())
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
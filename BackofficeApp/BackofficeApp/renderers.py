@@ -0,0 +1,36 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+_fallback_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer that encodes responses with `orjson` instead of the standard `json` module. <br>
+    Types `orjson` doesn't know (lazy translations, decimals, querysets, ...) are converted by DRF's `JSONEncoder`. <br>
+    Requests for indented output (browsable API) are rendered by the default `JSONRenderer`.
+
+    Methods:
+        render: Renders data into JSON bytes.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Renders data into JSON bytes.
+
+        Args:
+            data (Any): Data to render.
+            accepted_media_type (str): Accepted media type of the request.
+            renderer_context (dict): Context of the renderer.
+
+        Returns:
+            (bytes): Rendered JSON.
+        """
+        if data is None:
+            return b''
+
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return orjson.dumps(data, default=_fallback_encoder.default, option=orjson.OPT_NON_STR_KEYS)
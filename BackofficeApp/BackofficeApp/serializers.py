@@ -0,0 +1,30 @@
+import copy
+from rest_framework import serializers
+
+
+_generated_fields = {}
+
+
+class CachedFieldsMixin(serializers.ModelSerializer):
+    """
+    Builds the fields of a ModelSerializer from the model once per serializer class. <br>
+    Following instances get fresh copies of the cached fields,
+        so the model introspection of `ModelSerializer.get_fields` isn't repeated on every request. <br>
+    Must be placed after mixins that override `get_fields` (e.g. `UniqueFieldsMixin`),
+        so they keep working on the copies.
+
+    Methods:
+        get_fields: Returns copies of the cached fields of the serializer class.
+    """
+    def get_fields(self):
+        """
+        Returns copies of the fields of the serializer class, generating them on the first call.
+        Copies are made the same way DRF copies declared fields, so every instance binds its own field objects.
+
+        Returns:
+            (dict): Field name to unbound field instance.
+        """
+        cls = type(self)
+        if cls not in _generated_fields:
+            _generated_fields[cls] = super().get_fields()
+        return copy.deepcopy(_generated_fields[cls])
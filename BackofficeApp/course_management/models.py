@@ -1,7 +1,9 @@
 import os
-from django.core.files.storage import default_storage
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
+from BackofficeApp.files import delete_files_on_commit, update_fields_except, remember_file_names, stored_file_names
 
 
 class Course(models.Model):
@@ -32,14 +34,12 @@ class Course(models.Model):
         employees (Employee): __ManyToManyField from `Employee` model__ <br>
             Teachers that have access for this course. <br>
             Accessible as `teachers`, accessible in query as `teacher`.
-        partners (Partner): __ManyToManyField from `Partner` model__ <br>
-            Partners that have access to this course. <br>
-            `Right now is not implemented and all partners have access to all courses.`
 
     Methods:
         __str__: Returns string representation of the course.
+        from_db: Creates an instance from a database row and remembers the name of it's image.
         save: Custom save method to handle image update.
-        delete: Deletes the course and it's associated image from the storage.
+        delete: Deletes the course, it's associated image and files of it's lessons from the storage.
     """
     class Status(models.TextChoices):
         """
@@ -68,6 +68,21 @@ class Course(models.Model):
     
     categories = models.ManyToManyField('Category', related_name="courses", related_query_name="course")
 
+    class Meta:
+        """
+        Indexes for the filters of the courses list.
+
+        Attributes:
+            indexes (List): 
+                btree indexes on `status` and on the age range `(min_age, max_age)`. <br>
+                GIN trigram index on `UPPER(name)`, the expression Postgres compares in `name__icontains`.
+        """
+        indexes = [
+            models.Index(fields=['status'], name='course_status_idx'),
+            models.Index(fields=['min_age', 'max_age'], name='course_age_range_idx'),
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='course_name_upper_trgm'),
+        ]
+
     def __str__(self):
         """
         Returns string representation of the course.
@@ -77,41 +92,65 @@ class Course(models.Model):
         """
         return self.name
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Creates an instance from a database row and remembers the name of it's image.
+
+        Returns:
+            (Course): The loaded course.
+        """
+        instance = super().from_db(db, field_names, values)
+        remember_file_names(instance, ['image'])
+        return instance
+
     def save(self, *args, **kwargs):
         """
         Custom save method to handle image update.
-        If new image is provided old one is deleted.
-        If course have an image and on update the new one isn't provided we not rewrite image field with Null value.
+        If new image is provided old one is deleted after the UPDATE succeeds and the transaction is committed.
+        If course have an image and on update the new one isn't provided we not rewrite image field with Null value, 
+            image column is left out of the UPDATE. <br>
+        Saves with `update_fields` without image skip the image handling. <br>
+        The old image name is remembered when the course is loaded, so no extra SELECT is made.
         """
         is_update = self.pk is not None
+        update_fields = kwargs.get('update_fields')
+        preserved_fields = []
+        replaced_files = []
+
+        if is_update and (update_fields is None or 'image' in update_fields):
+            old_image = stored_file_names(self, ['image'])['image']
+            if old_image and self.image and old_image != self.image.name:
+                replaced_files.append(old_image)
+            if old_image and not self.image:
+                self.image = old_image
+                preserved_fields.append('image')
 
-        if is_update:
-            old_course = Course.objects.get(pk=self.pk)
-            if old_course.image and self.image and old_course.image != self.image:
-                default_storage.delete(old_course.image.name)
-            if old_course.image and not self.image:
-                self.image = old_course.image.name.split("/")[-1]
+        if preserved_fields and update_fields is None:
+            kwargs['update_fields'] = update_fields_except(self, preserved_fields)
 
         super().save(*args, **kwargs)
+        delete_files_on_commit(replaced_files)
+        if update_fields is None or 'image' in update_fields:
+            remember_file_names(self, ['image'])
     
     def delete(self, *args, **kwargs):
         """
-        Deletes the course and it's associated image from the storage.
+        Deletes the course, it's associated image and files of it's lessons from the storage. <br>
+        All files are deleted from the storage in a single batch in background after the transaction is committed. <br>
+        File names of lessons are read with `values_list`, lessons themselves are removed by the cascade 
+            in a single DELETE without loading instances, so `Lesson.delete` isn't called for them.
 
         Arguments:
             *args (tuple): Positional arguments.
             **kwargs (dict): Keyword arguments.
-
-        Raises:
-            Exception: If there is an error deleting the image from the storage.
         """
-        if self.image:
-            try:
-                default_storage.delete(self.image.name)
-            except Exception as e:
-                print(f"Error deleting image from S3: {e}")
+        file_names = [self.image.name] if self.image else []
+        for presentation, additional_file in self.lessons.values_list('presentation', 'additional_file'):
+            file_names += [presentation, additional_file]
 
         super(Course, self).delete(*args, **kwargs)
+        delete_files_on_commit(file_names)
 
 
 class Category(models.Model):
@@ -121,6 +160,8 @@ class Category(models.Model):
     Attributes:
         id (BigAutoField): Primary key.
         name (CharField): Name of the category, must be unique.
+        updated_at (DateTimeField): (__Autoupdates__) <br>
+            Time of the last change of the category. Used to build ETag of the categories responses.
     
     Other Parameters: Relationships
         parent (OneToMany): __ForeignKey__ <br>
@@ -138,6 +179,7 @@ class Category(models.Model):
     """
     id = models.BigAutoField(primary_key=True)
     name = models.CharField(max_length=150, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     parent = models.ForeignKey(
         'self', 
@@ -148,6 +190,18 @@ class Category(models.Model):
         related_query_name="subcategory"
     )
 
+    class Meta:
+        """
+        Indexes for the filters by category name.
+
+        Attributes:
+            indexes (List): 
+                GIN trigram index on `UPPER(name)`, the expression Postgres compares in `name__icontains`.
+        """
+        indexes = [
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='category_name_upper_trgm'),
+        ]
+
     def __str__(self):
         """
         Returns the string representation of the category.
@@ -161,7 +215,10 @@ class Category(models.Model):
 def presentation_upload_path(instance, filename):
     """
     Defines the upload path for presentations and additional files related to lessons. <br>
-    File path is a combination of the course name and the original filename.
+    File path is a combination of the course name and the original filename. <br>
+    Reads the course from the lesson's relation cache, which is already filled when the lesson comes from 
+        `LessonViewSet` (`select_related('course')`) or from `LessonSerializer` on create (course instance in validated data), 
+        so no extra query is made in these cases.
     
     Args:
         instance (Lesson): The instance of the lesson being saved.
@@ -197,6 +254,7 @@ class Lesson(models.Model):
 
     Methods:
         __str__: Returns the string representation of the lesson.
+        from_db: Creates an instance from a database row and remembers names of it's files.
         save: Custom save method to handle files update.
         delete: Deletes the lesson and its associated files from storage.
     """
@@ -220,51 +278,63 @@ class Lesson(models.Model):
         """
         return self.name
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Creates an instance from a database row and remembers names of it's files.
+
+        Returns:
+            (Lesson): The loaded lesson.
+        """
+        instance = super().from_db(db, field_names, values)
+        remember_file_names(instance, ['presentation', 'additional_file'])
+        return instance
+
     def save(self, *args, **kwargs):
         """
         Custom save method to handle files update.
-        If new file is provided old one is deleted.
-        If lesson have a file and on update the new one isn't provided we not rewrite it's file field with Null value.
+        If new file is provided old one is deleted after the UPDATE succeeds and the transaction is committed.
+        If lesson have a file and on update the new one isn't provided we not rewrite it's file field with Null value, 
+            file column is left out of the UPDATE. <br>
+        Saves with `update_fields` without file fields skip the files handling. <br>
+        Old file names are remembered when the lesson is loaded, so no extra SELECT is made.
         """
         is_update = self.pk is not None
-
-        if is_update:
-            old_lesson = Lesson.objects.get(pk=self.pk)
-
-            if old_lesson.presentation and self.presentation and old_lesson.presentation != self.presentation:
-                default_storage.delete(old_lesson.presentation.name)
-            if old_lesson.presentation and not self.presentation:
-                self.presentation = old_lesson.presentation.name.split("/")[-1]
-
-            if old_lesson.additional_file and self.additional_file and old_lesson.additional_file != self.additional_file:
-                default_storage.delete(old_lesson.additional_file.name)
-            if old_lesson.additional_file and not self.additional_file:
-                self.additional_file = old_lesson.additional_file.name.split("/")[-1]
+        update_fields = kwargs.get('update_fields')
+        file_fields = [
+            name for name in ('presentation', 'additional_file') 
+            if update_fields is None or name in update_fields
+        ]
+        preserved_fields = []
+        replaced_files = []
+
+        if is_update and file_fields:
+            old_files = stored_file_names(self, file_fields)
+            for name in file_fields:
+                old_file, new_file = old_files[name], getattr(self, name)
+                if old_file and new_file and old_file != new_file.name:
+                    replaced_files.append(old_file)
+                if old_file and not new_file:
+                    setattr(self, name, old_file)
+                    preserved_fields.append(name)
+
+        if preserved_fields and update_fields is None:
+            kwargs['update_fields'] = update_fields_except(self, preserved_fields)
 
         super().save(*args, **kwargs)
+        delete_files_on_commit(replaced_files)
+        remember_file_names(self, file_fields)
     
     def delete(self, *args, **kwargs):
         """
-        Deletes the lesson and its associated files from storage.
+        Deletes the lesson and its associated files from storage. <br>
+        Files are deleted in background after the transaction is committed.
 
         Args:
             *args (tuple): Positional arguments.
             **kwargs (dict): Keyword arguments.
-
-        Raises:
-            Exception: If there is an error deleting the presentation or additional file from the storage.
         """
-        if self.presentation:
-            try:
-                default_storage.delete(self.presentation.name)
-            except Exception as e:
-                print(f"Error deleting presentation from S3: {e}")
-        
-        if self.additional_file:
-            try:
-                default_storage.delete(self.additional_file.name)
-            except Exception as e:
-                print(f"Error deleting additional file from S3: {e}")
-
+        file_names = [self.presentation.name, self.additional_file.name]
         super(Lesson, self).delete(*args, **kwargs)
+        delete_files_on_commit(file_names)
     
\ No newline at end of file
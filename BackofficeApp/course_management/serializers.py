@@ -4,6 +4,13 @@ from .models import Course, Category, Lesson
 from partner_management.models import Employee
 
 
+# Employees who can be assigned to a course, shared by the `teachers` fields of the course serializers.
+teachers_queryset = Employee.objects.filter(user__groups__name="teacher")
+
+# Translatable labels of the course statuses, translated to the request language on `str()`.
+course_status_display = dict(Course.Status.choices)
+
+
 class CourseSerializer(serializers.ModelSerializer):
     """
     Serializer for the Course model that ensures relationships with teachers and lessons, 
@@ -30,7 +37,7 @@ class CourseSerializer(serializers.ModelSerializer):
     """
     teachers = serializers.PrimaryKeyRelatedField(
         many=True, 
-        queryset=Employee.objects.filter(user__groups__name="teacher"), 
+        queryset=teachers_queryset, 
         allow_null=True, 
         required=False
     )   
@@ -46,7 +53,8 @@ class CourseSerializer(serializers.ModelSerializer):
 
     def validate_categories(self, value):
         """
-        Ensures that all parent categories of a selected category are automatically included in the course.
+        Ensures that all parent categories of a selected category are automatically included in the course. <br>
+        All ancestors are collected by a single recursive query instead of a query per parent.
 
         Parameters:
             value (List): List of categories selected for the course.
@@ -54,18 +62,26 @@ class CourseSerializer(serializers.ModelSerializer):
         Returns:
             (List): List of categories including all hierarchical parents.
         """
-        validated_categories = set(value)
-        for category in value:
-            while category.parent:
-                validated_categories.add(category.parent)
-                category = category.parent
-        return list(validated_categories)
+        if not value:
+            return value
+        categories_with_parents = Category.objects.raw(
+            """
+            WITH RECURSIVE ancestors AS (
+                SELECT id, parent_id FROM course_management_category WHERE id = ANY(%s)
+                UNION
+                SELECT c.id, c.parent_id FROM course_management_category c JOIN ancestors a ON c.id = a.parent_id
+            )
+            SELECT * FROM course_management_category WHERE id IN (SELECT id FROM ancestors)
+            """,
+            [[category.pk for category in value]]
+        )
+        return list(categories_with_parents)
     
     def to_representation(self, instance):
         """
         Convert a Course instance into a dictionary format that can be serialized. <br>
         Translate the 'status' field by the language of the request. Default is 'en'. <br>
-        Changes the 'categories' field to a list of category names.
+        Changes the 'categories' field to a list of category names, read from the prefetch cache if categories are prefetched.
 
         Args:
             instance (Course): The Course instance to be serialized.
@@ -74,10 +90,28 @@ class CourseSerializer(serializers.ModelSerializer):
             (dict): A dictionary representing the serialized Course instance.
         """
         representation = super().to_representation(instance)
-        representation['status'] = instance.get_status_display()
-        representation['categories'] = [category.name for category in instance.categories.all()]
+        representation['status'] = str(course_status_display.get(instance.status, instance.status))
+        categories = getattr(instance, '_prefetched_objects_cache', {}).get('categories')
+        if categories is None:
+            categories = instance.categories.all()
+        representation['categories'] = [category.name for category in categories]
         return representation
 
+class CourseListSerializer(CourseSerializer):
+    """
+    Serializer for the list of courses. <br>
+    Same as `CourseSerializer` but without the `note` field, so the list doesn't load notes of every course.
+
+    Attributes: Meta
+        model (`django.db.models.Model`): `Course` model to serialize.
+        exclude (List): `['note']` <br>
+            all fields of the model to serialize except `note`.
+    """
+    class Meta:
+        model = Course
+        exclude = ['note']
+
+
 class CourseSerializerUpdateTeachers(serializers.ModelSerializer):
     """
     Serializer to only update teachers of a course. <br>
@@ -95,7 +129,7 @@ class CourseSerializerUpdateTeachers(serializers.ModelSerializer):
     """
     teachers = serializers.PrimaryKeyRelatedField(
         many=True, 
-        queryset=Employee.objects.filter(user__groups__name="teacher"), 
+        queryset=teachers_queryset, 
         allow_null=True, 
         required=False
     )
@@ -172,3 +206,18 @@ class LessonSerializer(serializers.ModelSerializer):
         if value and not (value.name.endswith('.pdf') or value.name.endswith('.zip')):
             raise serializers.ValidationError("Only .pdf or .zip files are allowed as additional file.")
         return value
+
+
+class LessonListSerializer(LessonSerializer):
+    """
+    Serializer for the list of lessons. <br>
+    Same as `LessonSerializer` but without the `description` field, so the list doesn't load descriptions of every lesson.
+
+    Attributes: Meta
+        model (`django.db.models.Model`): `Lesson` model to serialize.
+        exclude (List): `['description']` <br>
+            all fields of the model to serialize except `description`.
+    """
+    class Meta:
+        model = Lesson
+        exclude = ['description']
@@ -1,3 +1,142 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.db import IntegrityError, transaction
+from django.test import TestCase, TransactionTestCase
+
+from .models import Course, Lesson
+from BackofficeApp.files import _delete_files_in_background
+
+
+@mock.patch('BackofficeApp.files._storage_executor')
+class FileReplacementTests(TestCase):
+    """
+    Tests that saves keep or replace stored files by the names remembered on load
+        and old files are deleted from the storage only after the transaction is committed.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.course = Course.objects.create(name='Course', min_age=6, max_age=10, image='course_images/old.png')
+        cls.lesson = Lesson.objects.create(
+            name='Lesson', course=cls.course,
+            presentation='Course/old.pptx', additional_file='Course/old.zip'
+        )
+
+    def test_keeps_image_when_none_is_provided(self, executor):
+        course = Course.objects.get(pk=self.course.pk)
+        course.image = None
+        course.name = 'Renamed'
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            course.save()
+
+        course.refresh_from_db()
+        self.assertEqual(course.name, 'Renamed')
+        self.assertEqual(course.image.name, 'course_images/old.png')
+        self.assertEqual(callbacks, [])
+        executor.submit.assert_not_called()
+
+    def test_keeps_image_when_same_one_is_saved(self, executor):
+        course = Course.objects.get(pk=self.course.pk)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            course.save()
+
+        self.assertEqual(callbacks, [])
+        executor.submit.assert_not_called()
+
+    def test_deletes_replaced_image_on_commit(self, executor):
+        course = Course.objects.get(pk=self.course.pk)
+        course.image = 'course_images/new.png'
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            course.save()
+            executor.submit.assert_not_called()
+
+        self.assertEqual(Course.objects.get(pk=self.course.pk).image.name, 'course_images/new.png')
+        self.assertEqual(len(callbacks), 1)
+        executor.submit.assert_not_called()
+
+        callbacks[0]()
+        executor.submit.assert_called_once_with(_delete_files_in_background, ['course_images/old.png'])
+
+    def test_keeps_replaced_image_on_rollback(self, executor):
+        course = Course.objects.get(pk=self.course.pk)
+        course.image = 'course_images/new.png'
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    course.save()
+                    raise RuntimeError
+
+        self.assertEqual(Course.objects.get(pk=self.course.pk).image.name, 'course_images/old.png')
+        self.assertEqual(callbacks, [])
+        executor.submit.assert_not_called()
+
+    def test_update_fields_without_image_skip_files(self, executor):
+        course = Course.objects.only('id', 'name').get(pk=self.course.pk)
+        course.name = 'Renamed'
+
+        with self.assertNumQueries(1), self.captureOnCommitCallbacks(execute=True) as callbacks:
+            course.save(update_fields=['name'])
+
+        self.assertEqual(Course.objects.get(pk=self.course.pk).image.name, 'course_images/old.png')
+        self.assertEqual(callbacks, [])
+
+    def test_lesson_replaces_one_file_and_keeps_the_other(self, executor):
+        lesson = Lesson.objects.get(pk=self.lesson.pk)
+        lesson.presentation = 'Course/new.pptx'
+        lesson.additional_file = None
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            lesson.save()
+
+        lesson.refresh_from_db()
+        self.assertEqual(lesson.presentation.name, 'Course/new.pptx')
+        self.assertEqual(lesson.additional_file.name, 'Course/old.zip')
+        self.assertEqual(len(callbacks), 1)
+        executor.submit.assert_not_called()
+
+        callbacks[0]()
+        executor.submit.assert_called_once_with(_delete_files_in_background, ['Course/old.pptx'])
+
+
+@mock.patch('BackofficeApp.files._storage_executor')
+class AutocommitFileReplacementTests(TransactionTestCase):
+    """
+    Tests of saves in autocommit mode, as the views run without `ATOMIC_REQUESTS`, 
+        where `on_commit` callbacks run as soon as they are registered.
+    """
+    def setUp(self):
+        self.course = Course.objects.create(name='Course', min_age=6, max_age=10, image='course_images/old.png')
+
+    def test_deletes_replaced_image_after_update(self, executor):
+        course = Course.objects.get(pk=self.course.pk)
+        course.image = 'course_images/new.png'
+
+        course.save()
+
+        executor.submit.assert_called_once_with(_delete_files_in_background, ['course_images/old.png'])
+
+    def test_keeps_replaced_image_when_update_fails(self, executor):
+        course = Course.objects.get(pk=self.course.pk)
+        course.image = 'course_images/new.png'
+        course.min_age = None
+
+        with self.assertRaises(IntegrityError):
+            course.save()
+
+        self.assertEqual(Course.objects.get(pk=self.course.pk).image.name, 'course_images/old.png')
+        executor.submit.assert_not_called()
+
+    def test_keeps_replaced_lesson_file_when_update_fails(self, executor):
+        lesson = Lesson.objects.create(name='Lesson', course=self.course, presentation='Course/old.pptx')
+        lesson = Lesson.objects.get(pk=lesson.pk)
+        lesson.presentation = 'Course/new.pptx'
+        lesson.name = None
+
+        with self.assertRaises(IntegrityError):
+            lesson.save()
+
+        self.assertEqual(Lesson.objects.get(pk=lesson.pk).presentation.name, 'Course/old.pptx')
+        executor.submit.assert_not_called()
@@ -1,23 +1,52 @@
-from django.db.models import Q
+from django.db.models import Q, Count, Max, Exists, OuterRef
+from django.utils.decorators import method_decorator
+from django.utils.translation import get_language
+from django.views.decorators.http import etag
 
 from rest_framework import viewsets
+from rest_framework.pagination import CursorPagination
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
 from .models import Course, Category, Lesson
 from .serializers import (
     CourseSerializer, 
+    CourseListSerializer,
     CategorySerializer, 
     LessonSerializer, 
+    LessonListSerializer,
     CourseSerializerUpdateTeachers,
 )
 
 
+class CourseCursorPagination(CursorPagination):
+    """
+    Keyset pagination for courses. <br>
+    Pages are fetched by `id > last seen id` instead of OFFSET, so deep pages cost the same as the first one.
+
+    Attributes:
+        ordering (str): Courses are ordered by their ID.
+    """
+    ordering = 'id'
+
+
+class LessonCursorPagination(CursorPagination):
+    """
+    Keyset pagination for lessons. <br>
+    Pages are fetched by `id > last seen id` instead of OFFSET, so deep pages cost the same as the first one.
+
+    Attributes:
+        ordering (str): Lessons are ordered by their ID.
+    """
+    ordering = 'id'
+
+
 class CourseViewSet(viewsets.ModelViewSet):
     """
     Viewset to manage courses.
 
     Attributes:
         parser_classes (tuple): Parsers for JSON, multipart, and form data.
+        pagination_class (CursorPagination): `CourseCursorPagination`.
 
     Methods: 
         get_serializer_class: 
@@ -26,6 +55,7 @@ class CourseViewSet(viewsets.ModelViewSet):
             Customizes the queryset based on user group and multiple filters like search, status, category, and age.
     """
     parser_classes = (JSONParser, MultiPartParser, FormParser)
+    pagination_class = CourseCursorPagination
 
     def get_serializer_class(self):
         """
@@ -33,18 +63,23 @@ class CourseViewSet(viewsets.ModelViewSet):
 
         Returns:
             CourseSerializer (ModelSerializer): Default.
+            CourseListSerializer (ModelSerializer): For `list` action.
             CourseSerializerUpdateTeachers (ModelSerializer): 
                 For `owner` user on `update` and `partial_update` actions. <br>
                 Created to ensure `owner` can't change any information of the course except list of teachers that have access to it.
         """
-        if self.request.user.groups.filter(name='owner').exists() and self.action in ['update', 'partial_update']:
+        if 'owner' in self.request.user.group_names and self.action in ['update', 'partial_update']:
             return CourseSerializerUpdateTeachers
+        if self.action == 'list':
+            return CourseListSerializer
         return CourseSerializer
 
     def get_queryset(self):
         """
         Customizes the queryset retrieval for courses based on user group and filters. <br>
-        If the user is a teacher, it will return lessons filtered to those they have access to.
+        If the user is a teacher, it will return lessons filtered to those they have access to. <br>
+        Categories, teachers and lessons are prefetched to avoid a query per course on serialization. <br>
+        For `list` action the `note` field isn't loaded.
 
         Attributes: Filters
             teacher (int): Filters courses by teacher id to ones that they have access to.
@@ -62,9 +97,9 @@ class CourseViewSet(viewsets.ModelViewSet):
         Returns:
             (QuerySet): A filtered queryset of Course objects.
         """
-        queryset = Course.objects.all().order_by('id')
+        queryset = Course.objects.prefetch_related('categories', 'teachers', 'lessons').order_by('id')
 
-        if self.request.user.groups.filter(name='teacher').exists():
+        if 'teacher' in self.request.user.group_names:
             queryset = queryset.filter(teacher__user=self.request.user)
 
         teacher = self.request.query_params.get('teacher', None)
@@ -73,6 +108,9 @@ class CourseViewSet(viewsets.ModelViewSet):
         category = self.request.query_params.get('category', None)
         age = self.request.query_params.get('age', None)
 
+        if self.action == 'list':
+            queryset = queryset.defer('note')
+
         if teacher:
             queryset = queryset.filter(teacher=teacher)
         if search:
@@ -80,16 +118,43 @@ class CourseViewSet(viewsets.ModelViewSet):
         if status:
             queryset = queryset.filter(status=status)
         if category:
-            queryset = queryset.filter(categories__name__icontains=category)
+            # semi-join, a course with several matching categories is returned once without DISTINCT
+            queryset = queryset.filter(
+                Exists(Category.objects.filter(course=OuterRef('pk'), name__icontains=category))
+            )
         if age:
             queryset = queryset.filter(Q(min_age__lte=age) & Q(max_age__gte=age))
 
         return queryset
     
 
+def categories_etag(request, *args, **kwargs):
+    """
+    Builds ETag of the categories responses from the number of categories, the time of the last change, 
+        the negotiated renderer and the active language. <br>
+    Any create, update or delete of a category changes it, so unchanged categories are answered with 
+        `304 Not Modified` without serialization, 
+        while JSON and browsable API responses or different languages never share an ETag.
+
+    Args:
+        request (Request): The HTTP request object, content negotiation is already done.
+        *args (tuple): Positional arguments.
+        **kwargs (dict): Keyword arguments.
+
+    Returns:
+        (str): ETag of the categories.
+    """
+    state = Category.objects.aggregate(count=Count('id'), updated_at=Max('updated_at'))
+    updated_at = state['updated_at'].timestamp() if state['updated_at'] else 0
+    return f"categories-{state['count']}-{updated_at}-{request.accepted_renderer.format}-{get_language()}"
+
+
+@method_decorator(etag(categories_etag), name='list')
+@method_decorator(etag(categories_etag), name='retrieve')
 class CategoryViewSet(viewsets.ModelViewSet):
     """
-    Viewset to manage categories.
+    Viewset to manage categories. <br>
+    `list` and `retrieve` support conditional requests with `If-None-Match`.
 
     Attributes:
         queryset (QuerySet): Categories ordered by their ID.
@@ -104,20 +169,35 @@ class LessonViewSet(viewsets.ModelViewSet):
     Viewset to manage lessons.
 
     Attributes:
-        serializer_class (ModelSerializer): `LessonSerializer`.
         parser_classes (tuple): Parsers for JSON, multipart, and form data.
+        pagination_class (CursorPagination): `LessonCursorPagination`.
 
     Methods:
+        get_serializer_class: 
+            Determines the serializer class based on the action.
         get_queryset: 
             Customizes the queryset to show only lessons associated with the current user's courses.
     """
-    serializer_class = LessonSerializer
     parser_classes = (JSONParser, MultiPartParser, FormParser)
+    pagination_class = LessonCursorPagination
+
+    def get_serializer_class(self):
+        """
+        Determines the serializer class based on the action being performed.
+
+        Returns:
+            LessonSerializer (ModelSerializer): Default.
+            LessonListSerializer (ModelSerializer): For `list` action.
+        """
+        if self.action == 'list':
+            return LessonListSerializer
+        return LessonSerializer
 
     def get_queryset(self):
         """
-        Retrieves a customized queryset of lessons. <br>
-        If the user is a teacher, it will return lessons filtered to those they have access to.
+        Retrieves a customized queryset of lessons, ordered by `LessonCursorPagination`. <br>
+        If the user is a teacher, it will return lessons filtered to those they have access to. <br>
+        For `list` action the `description` field isn't loaded.
 
         Attributes: Filters
             course_id (int): Filters lessons by course id.
@@ -130,11 +210,14 @@ class LessonViewSet(viewsets.ModelViewSet):
         Returns:
             (QuerySet): A filtered queryset of Lesson objects.
         """
-        queryset = Lesson.objects.all().order_by('course')
+        queryset = Lesson.objects.select_related('course')
 
-        if self.request.user.groups.filter(name='teacher').exists():
+        if 'teacher' in self.request.user.group_names:
             queryset = queryset.filter(course__teacher__user=self.request.user)
 
+        if self.action == 'list':
+            queryset = queryset.defer('description')
+
         course_id = self.request.query_params.get('course_id', None)
 
         if course_id:
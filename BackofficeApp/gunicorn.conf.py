@@ -1,3 +1,4 @@
+import multiprocessing
 
 command = '/usr/local/bin/gunicorn'
 
@@ -5,16 +6,29 @@ wsgi_app = 'BackofficeApp.wsgi:application'
 
 bind = '0.0.0.0:8000'
 
-workers = 5
+workers = multiprocessing.cpu_count() * 2 + 1
 
-worker_class = 'gthread'
+# greenlet workers yield on socket waits (postgres, minio), which dominate request time
+worker_class = 'gevent'
 
-threads = 4
+worker_connections = 1000
 
-timeout = 30
+# every request runs in a new greenlet with its own django connection, so a persistent
+# connection would never be reused and only stay open until garbage collected
+raw_env = ['POSTGRES_CONN_MAX_AGE=0']
+
+timeout = 60
+
+graceful_timeout = 30
 
 errorlog = '/var/log/gunicorn/error.log'
 accesslog = '/var/log/gunicorn/access.log'
 loglevel = 'info'
 
 #access_log_format = '%({x-forwarded-for}i)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+
+
+def post_fork(server, worker):
+    # make psycopg2 cooperative, otherwise every query blocks the whole gevent worker
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
@@ -1,306 +1,289 @@
-from locust import HttpUser, task, between, TaskSet, SequentialTaskSet
+from locust import task, between, events, TaskSet, SequentialTaskSet
+from locust.contrib.fasthttp import FastHttpUser
+from requests.cookies import create_cookie
+from gevent.lock import Semaphore
+import gevent
 import random, uuid
 
 
+# access token lives 5 minutes (SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']), refresh it a bit earlier
+TOKEN_REFRESH_INTERVAL = 5 * 60 - 30
+
+# one login per role, all users of the role reuse its tokens: email -> session dict
+shared_sessions = {}
+shared_sessions_lock = Semaphore()
+
+
+def cookie_value(client, name):
+    for cookie in client.cookiejar:
+        if cookie.name == name:
+            return cookie.value
+
+
+def use_tokens(User):
+    # tokens come with path=/api or /auth (and secure in prod), resend them on every path
+    User.client.cookiejar.clear()
+    User.client.cookiejar.set_cookie(create_cookie('access_token', User.session['access_token']))
+    User.client.cookiejar.set_cookie(create_cookie('refresh_token', User.session['refresh_token']))
+    User.access_token = User.session['access_token']
+
+
+def shared_login(User, email, password):
+    with shared_sessions_lock:
+        session = shared_sessions.get(email)
+        if session is None:
+            response = User.client.post("/auth/token/", json={"email": email, "password": password})
+            if response.status_code != 200:
+                return None
+            session = {
+                'access_token': cookie_value(User.client, 'access_token'),
+                'refresh_token': cookie_value(User.client, 'refresh_token'),
+            }
+            User.session = session
+            use_tokens(User)
+            session['partner_id'] = User.client.get("/api/user-group-permissions/").json()["partner_id"]
+            session['refresher'] = gevent.spawn(keep_token_fresh, User)
+            shared_sessions[email] = session
+    User.session = session
+    use_tokens(User)
+    return session
+
+
+@events.test_stop.add_listener
+def drop_shared_sessions(environment, **kwargs):
+    with shared_sessions_lock:
+        for session in shared_sessions.values():
+            session['refresher'].kill()
+        shared_sessions.clear()
+
+
 def token_refresh(User):
-    response = User.client.post("/auth/token/refresh/")
-    if response.status_code == 200:
-        User.client.cookies.set('access_token', response.cookies['access_token'])
-        return 200
-    return response.status_code
+    session = User.session
+    stale_token = User.access_token
+    with shared_sessions_lock:
+        # another user of the role may have refreshed the token while we waited
+        if session['access_token'] == stale_token:
+            User.client.cookiejar.clear()
+            User.client.cookiejar.set_cookie(create_cookie('refresh_token', session['refresh_token']))
+            response = User.client.post("/auth/token/refresh/")
+            if response.status_code != 200:
+                return response.status_code
+            session['access_token'] = cookie_value(User.client, 'access_token')
+    use_tokens(User)
+    return 200
+
+
+def keep_token_fresh(User):
+    while True:
+        gevent.sleep(TOKEN_REFRESH_INTERVAL)
+        token_refresh(User)
+
+
+def send(User, method, url, **kwargs):
+    if User.session and User.access_token != User.session['access_token']:
+        use_tokens(User)
+    response = User.client.request(method, url, **kwargs)
+    # fallback for a token that expired anyway, refresh it and repeat the same request once
+    if response.status_code == 401 and User.session and token_refresh(User) == 200:
+        response = User.client.request(method, url, **kwargs)
+    return response
 
 
 class CoursesSurf(SequentialTaskSet):
     @task
     def list_courses(self):
-        response = self.client.get("/api/courses/")
+        response = send(self.user, "GET", "/api/courses/")
         if response.status_code == 200:
-            for i in range(response.json()["count"]):
-                self.user.courses_list.append(response.json()["results"][i]["id"])
-                
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/courses/")
+            self.user.courses_list.clear()
+            for course in response.json()["results"]:
+                self.user.courses_list.append(course["id"])
 
     @task
     def list_categories(self):
-        response = self.client.get("/api/categories/")
-        if response.status_code == 401:
-            status_code = token_refresh(self)
-            if status_code == 200:
-                self.client.get("/api/categories/")
+        send(self.user, "GET", "/api/categories/")
 
     @task
     def list_course(self):
         if len(self.user.courses_list) > 0:
             i = random.choice(self.user.courses_list)
-            response = self.client.get("/api/courses/%i/" % i)
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/courses/%i/" % i)
+            send(self.user, "GET", f"/api/courses/{i}/", name="/api/courses/[id]/")
 
     @task
     def list_lessons(self):
         if len(self.user.courses_list) > 0:
             i = random.choice(self.user.courses_list)
-            response = self.client.get("/api/lessons/?course_id=%i" % i)
+            response = send(self.user, "GET", f"/api/lessons/?course_id={i}", name="/api/lessons/?course_id=[id]")
             if response.status_code == 200:
-                for i in range(response.json()["count"]):
-                    self.user.lessons_list.append(response.json()["results"][i]["id"])
-
-                if response.status_code == 401:
-                    status_code = token_refresh(self)
-                    if status_code == 200:
-                        self.client.get("/api/lessons/?course_id=%i" % i)
+                self.user.lessons_list.clear()
+                for lesson in response.json()["results"]:
+                    self.user.lessons_list.append(lesson["id"])
 
     @task
     def list_lesson(self):
         if len(self.user.lessons_list) > 0:
             i = random.choice(self.user.lessons_list)
-            response = self.client.get("/api/lessons/%i/" % i)
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/lessons/%i/" % i)
+            send(self.user, "GET", f"/api/lessons/{i}/", name="/api/lessons/[id]/")
 
 
-class EmployeeUser(HttpUser):
+class EmployeeUser(FastHttpUser):
     weight = 10
     wait_time = between(5, 10)
+    network_timeout = 30.0
+    connection_timeout = 10.0
     tasks = {CoursesSurf: 10}
 
-    partner_id = 0
-    courses_list = []
-    lessons_list = []
-
     def on_start(self):
-        response = self.client.post("/api/token/", json={"email": "teacher@gmail.com", "password": "teacher"})
-        if response.status_code == 200:
-            self.client.cookies.set('access_token', response.cookies['access_token'])
-            self.client.cookies.set('refresh_token', response.cookies['refresh_token'])
-            self.partner_id = self.client.get("/api/user-group-permissions/").json()["partner_id"]
+        self.partner_id = 0
+        self.courses_list = []
+        self.lessons_list = []
+
+        self.session = shared_login(self, "teacher@gmail.com", "teacher")
+        if self.session:
+            self.partner_id = self.session['partner_id']
 
     @task
     def list_employees(self):
-        response = self.client.get("/api/employees/")
-        if response.status_code == 401:
-            status_code = token_refresh(self)
-            if status_code == 200:
-                self.client.get("/api/employees/")
+        send(self, "GET", "/api/employees/")
 
 
-class OwnerUser(HttpUser):
+class OwnerUser(FastHttpUser):
     wait_time = between(5, 10)
+    network_timeout = 30.0
+    connection_timeout = 10.0
     weight = 1
     tasks = {CoursesSurf: 7}
 
-    partner_id = 0
-    courses_list = []
-    lessons_list = []
-    branches_list = []
-    employees_list = []
-
     def on_start(self):
-        response = self.client.post("/api/token/", json={"email": "owner@gmail.com", "password": "owner"})
-        if response.status_code == 200:
-            self.client.cookies.set('access_token', response.cookies['access_token'])
-            self.client.cookies.set('refresh_token', response.cookies['refresh_token'])
-            self.partner_id = self.client.get("/api/user-group-permissions/").json()["partner_id"]
+        self.partner_id = 0
+        self.courses_list = []
+        self.lessons_list = []
+        self.branches_list = []
+        self.employees_list = []
+
+        self.session = shared_login(self, "owner@gmail.com", "owner")
+        if self.session:
+            self.partner_id = self.session['partner_id']
 
     @task(10)
     def list_partner(self):
-        response = self.client.get("/api/partners/%i/" % self.partner_id)
-        if response.status_code == 401:
-            status_code = token_refresh(self)
-            if status_code == 200:
-                self.client.get("/api/partners/")
+        send(self, "GET", f"/api/partners/{self.partner_id}/", name="/api/partners/[id]/")
 
     @task(100)
     def change_partner(self):
-        response = self.client.patch("/api/partners/%i/" % self.partner_id, data={})
-        if response.status_code == 401:
-            status_code = token_refresh(self)
-            if status_code == 200:
-                self.client.get("/api/partners/")
+        send(self, "PATCH", f"/api/partners/{self.partner_id}/", data={}, name="/api/partners/[id]/")
 
     @task(3)
     def list_branches(self):
-        response = self.client.get("/api/branches/")
+        response = send(self, "GET", "/api/branches/")
         if response.status_code == 200:
-            for i in range(response.json()["count"]):
-                self.branches_list.append(response.json()["results"][i]["id"])
-
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/branches/")
-
+            self.branches_list.clear()
+            for branch in response.json()["results"]:
+                self.branches_list.append(branch["id"])
 
     @task
     def change_branch(self):
         if len(self.branches_list) > 0:
             i = random.choice(self.branches_list)
-            response = self.client.patch("/api/branches/%i/" % i, data={})
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/branches/")
+            send(self, "PATCH", f"/api/branches/{i}/", data={}, name="/api/branches/[id]/")
 
     @task(4)
     def list_employees(self):
-        response = self.client.get("/api/employees/")
+        response = send(self, "GET", "/api/employees/")
         if response.status_code == 200:
-            for i in range(response.json()["count"]):
-                self.employees_list.append(response.json()["results"][i]["user"]["id"])
-
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/employees/")
+            self.employees_list.clear()
+            for employee in response.json()["results"]:
+                self.employees_list.append(employee["user"]["id"])
 
     @task(8)
     def list_employee(self):
         if len(self.employees_list) > 0:
             i = random.choice(self.employees_list)
-            response = self.client.get("/api/employees/%i/" % i)
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/employees/%i/" % i)
+            send(self, "GET", f"/api/employees/{i}/", name="/api/employees/[id]/")
 
     @task
     def change_employee(self):
         if len(self.employees_list) > 0:
             i = random.choice(self.employees_list)
-            response = self.client.patch("/api/employees/%i/" % i, data={})
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/employees/")
+            send(self, "PATCH", f"/api/employees/{i}/", data={}, name="/api/employees/[id]/")
 
 
-class Superuser(HttpUser):
+class Superuser(FastHttpUser):
     fixed_count = 1
+    network_timeout = 30.0
+    connection_timeout = 10.0
     tasks = {CoursesSurf: 10}
 
-    partner_list = []
-    courses_list = []
-    lessons_list = []
-    branches_list = []
-    employees_list = []
-
     def on_start(self):
-        response = self.client.post("/api/token/", json={"email": "superuser@gmail.com", "password": "superuser"})
-        if response.status_code == 200:
-            self.client.cookies.set('access_token', response.cookies['access_token'])
-            self.client.cookies.set('refresh_token', response.cookies['refresh_token'])
-            self.client.get("/api/user-group-permissions/")
+        self.partner_list = []
+        self.courses_list = []
+        self.lessons_list = []
+        self.branches_list = []
+        self.employees_list = []
+
+        self.session = shared_login(self, "superuser@gmail.com", "superuser")
 
     @task
     def change_course(self):
         if len(self.courses_list) > 0:
             i = random.choice(self.courses_list)
-            response = self.client.patch("/api/courses/%i/" % i, data={})
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/courses/")
+            send(self, "PATCH", f"/api/courses/{i}/", data={}, name="/api/courses/[id]/")
 
     @task
     def change_lesson(self):
         if len(self.lessons_list) > 0:
             i = random.choice(self.lessons_list)
-            response = self.client.patch("/api/lessons/%i/" % i, data={})
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/lessons/")
+            send(self, "PATCH", f"/api/lessons/{i}/", data={}, name="/api/lessons/[id]/")
 
     @task(12)
     def list_partners(self):
-        response = self.client.get("/api/partners/")
+        response = send(self, "GET", "/api/partners/")
         if response.status_code == 200:
-            for i in range(response.json()["count"]):
-                self.partner_list.append(response.json()["results"][i]["id"])
-
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/partners/")
+            self.partner_list.clear()
+            for partner in response.json()["results"]:
+                self.partner_list.append(partner["id"])
 
     @task(10)
     def list_partner(self):
         if len(self.partner_list) > 0:
             i = random.choice(self.partner_list)
-            response = self.client.get("/api/partners/%i/" % i)
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/partners/")
+            send(self, "GET", f"/api/partners/{i}/", name="/api/partners/[id]/")
 
     @task
     def change_partner(self):
         if len(self.partner_list) > 0:
             i = random.choice(self.partner_list)
-            response = self.client.patch("/api/partners/%i/" % i, data={})
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/partners/")
+            send(self, "PATCH", f"/api/partners/{i}/", data={}, name="/api/partners/[id]/")
 
     @task(3)
     def list_branches(self):
-        response = self.client.get("/api/branches/")
+        response = send(self, "GET", "/api/branches/")
         if response.status_code == 200:
-            for i in range(response.json()["count"]):
-                self.branches_list.append(response.json()["results"][i]["id"])
-
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/branches/")
-
+            self.branches_list.clear()
+            for branch in response.json()["results"]:
+                self.branches_list.append(branch["id"])
 
     @task
     def change_branch(self):
         if len(self.branches_list) > 0:
             i = random.choice(self.branches_list)
-            response = self.client.patch("/api/branches/%i/" % i, data={})
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/branches/")
+            send(self, "PATCH", f"/api/branches/{i}/", data={}, name="/api/branches/[id]/")
 
     @task(4)
     def list_employees(self):
-        response = self.client.get("/api/employees/")
+        response = send(self, "GET", "/api/employees/")
         if response.status_code == 200:
-            for i in range(response.json()["count"]):
-                self.employees_list.append(response.json()["results"][i]["user"]["id"])
-
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/employees/")
+            self.employees_list.clear()
+            for employee in response.json()["results"]:
+                self.employees_list.append(employee["user"]["id"])
 
     @task(8)
     def list_employee(self):
         if len(self.employees_list) > 0:
             i = random.choice(self.employees_list)
-            response = self.client.get("/api/employees/%i/" % i)
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/employees/%i/" % i)
+            send(self, "GET", f"/api/employees/{i}/", name="/api/employees/[id]/")
 
     @task
     def change_employee(self):
         if len(self.employees_list) > 0:
             i = random.choice(self.employees_list)
-            response = self.client.patch("/api/employees/%i/" % i, data={})
-            if response.status_code == 401:
-                status_code = token_refresh(self)
-                if status_code == 200:
-                    self.client.get("/api/employees/")
+            send(self, "PATCH", f"/api/employees/{i}/", data={}, name="/api/employees/[id]/")
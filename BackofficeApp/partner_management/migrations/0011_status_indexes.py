@@ -0,0 +1,39 @@
+# Generated by Django 5.0.3 on 2026-10-15 09:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_management', '0007_category_updated_at'),
+        ('partner_management', '0010_alter_branch_area'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='branch',
+            name='status',
+            field=models.CharField(choices=[('active', 'Active'), ('inactive', 'Inactive')], db_index=True, default='active', max_length=25),
+        ),
+        migrations.AlterField(
+            model_name='employee',
+            name='status',
+            field=models.CharField(choices=[('active', 'Active'), ('inactive', 'Inactive'), ('left', 'Left'), ('fired', 'Fired')], db_index=True, default='active', max_length=25),
+        ),
+        migrations.AlterField(
+            model_name='partner',
+            name='status',
+            field=models.CharField(choices=[('active', 'Active'), ('inactive', 'Inactive')], db_index=True, default='active', max_length=25),
+        ),
+        migrations.AddIndex(
+            model_name='branch',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['partner', 'status'], name='branch_partner_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['partner', 'status'], name='employee_partner_active_idx'),
+        ),
+    ]
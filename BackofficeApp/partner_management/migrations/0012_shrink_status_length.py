@@ -0,0 +1,28 @@
+# Generated by Django 5.0.3 on 2026-10-15 09:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partner_management', '0011_status_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='branch',
+            name='status',
+            field=models.CharField(choices=[('active', 'Active'), ('inactive', 'Inactive')], db_index=True, default='active', max_length=8),
+        ),
+        migrations.AlterField(
+            model_name='employee',
+            name='status',
+            field=models.CharField(choices=[('active', 'Active'), ('inactive', 'Inactive'), ('left', 'Left'), ('fired', 'Fired')], db_index=True, default='active', max_length=8),
+        ),
+        migrations.AlterField(
+            model_name='partner',
+            name='status',
+            field=models.CharField(choices=[('active', 'Active'), ('inactive', 'Inactive')], db_index=True, default='active', max_length=8),
+        ),
+    ]
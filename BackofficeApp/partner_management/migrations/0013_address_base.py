@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-15 09:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partner_management', '0012_shrink_status_length'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='partner',
+            name='address_note',
+            field=models.CharField(blank=True, max_length=150, null=True),
+        ),
+    ]
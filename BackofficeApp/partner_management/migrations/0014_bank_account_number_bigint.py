@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-15 09:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partner_management', '0013_address_base'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employee',
+            name='bank_account_number',
+            field=models.PositiveBigIntegerField(),
+        ),
+    ]
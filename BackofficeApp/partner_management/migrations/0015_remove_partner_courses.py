@@ -0,0 +1,17 @@
+# Generated by Django 5.0.3 on 2026-10-15 09:53
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partner_management', '0014_bank_account_number_bigint'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='partner',
+            name='courses',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.3 on 2026-10-15 09:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partner_management', '0015_remove_partner_courses'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='branch',
+            index=models.Index(fields=['-opening_date', '-id'], name='branch_opening_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='partner',
+            index=models.Index(fields=['-creating_date', '-id'], name='partner_creating_date_idx'),
+        ),
+    ]
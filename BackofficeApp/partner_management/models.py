@@ -1,10 +1,35 @@
 from django.db import models
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from user_management.models import User
 from course_management.models import Course
+
+
+class Address(models.Model):
+    """
+    Abstract base with the address fields shared by partners and branches.
+
+    Attributes:
+        country (CharField): Country.
+        region (CharField): Region.
+        city (CharField): City.
+        street (CharField): Street.
+        house (PositiveSmallIntegerField): House number.
+        address_note (CharField): (__Optional__) <br>
+            Additional address details.
+    """
+    country = models.CharField(max_length=50)
+    region = models.CharField(max_length=100)
+    city = models.CharField(max_length=50)
+    street = models.CharField(max_length=50)
+    house = models.PositiveSmallIntegerField()
+    address_note = models.CharField(max_length=150, blank=True, null=True)
+
+    class Meta:
+        abstract = True
     
 
-class Partner(models.Model):
+class Partner(Address):
     """
     Represents a business partner entity.
 
@@ -18,21 +43,24 @@ class Partner(models.Model):
             Additional information about the partner.
         status (CharField): (__Optional, Default: 'ACTIVE'__) <br>
             Operational status of the partner, can be ACTIVE or INACTIVE.
-        country (CharField): Country of the partner.
-        region (CharField): Region of the partner.
-        city (CharField): City of the partner.
-        street (CharField): Street of the partner.
-        house (PositiveSmallIntegerField): House number.
+        country (CharField): Country of the partner. <br>
+            (Inherited from `Address`)
+        region (CharField): Region of the partner. <br>
+            (Inherited from `Address`)
+        city (CharField): City of the partner. <br>
+            (Inherited from `Address`)
+        street (CharField): Street of the partner. <br>
+            (Inherited from `Address`)
+        house (PositiveSmallIntegerField): House number. <br>
+            (Inherited from `Address`)
         address_note (CharField): (__Optional__) <br>
-            Additional address details.
+            Additional address details. <br>
+            (Inherited from `Address`)
     
     Other Parameters: Relationships
         owner (User): __OneToOneField__ <br>
             The user who owns this partner entity. <br>
             Can be NULL.
-        courses (Course): __ManyToManyField__ <br>
-            Courses accessible by this partner. <br>
-            Not currently implemented, all partners have access to all courses.
         
         employees (Employee): __ForeignKey from `Employee` model__ <br>
             Partner's employees. <br>
@@ -62,17 +90,21 @@ class Partner(models.Model):
     legal_entity = models.CharField(max_length=500)
     creating_date = models.DateField(auto_now_add=True)
     information = models.TextField(blank=True, null=True)
-    status = models.CharField(max_length=25, choices=Status, default=Status.ACTIVE)
-
-    country = models.CharField(max_length=50)
-    region = models.CharField(max_length=100)
-    city = models.CharField(max_length=50)
-    street = models.CharField(max_length=50)
-    house = models.PositiveSmallIntegerField()
-    address_note = models.CharField(max_length=50, blank=True, null=True)
+    status = models.CharField(max_length=8, choices=Status, default=Status.ACTIVE, db_index=True)
 
     owner = models.OneToOneField(User, on_delete=models.SET_NULL, null=True, related_name='owned_partner')
-    courses = models.ManyToManyField(Course, related_name="partners_with_access", related_query_name="partners_with_access")
+
+    class Meta:
+        """
+        Indexes for the partners list.
+
+        Attributes:
+            indexes (List): 
+                Index on `(-creating_date, -id)`, the ordering of the partners list pages.
+        """
+        indexes = [
+            models.Index(fields=['-creating_date', '-id'], name='partner_creating_date_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -83,7 +115,7 @@ class Employee(models.Model):
     Represents an employee of the partner.
 
     Attributes:
-        bank_account_number (IntegerField): Bank account number for payroll purposes.
+        bank_account_number (PositiveBigIntegerField): Bank account number for payroll purposes.
         status (CharField): (__Optional, Default: 'ACTIVE'__) <br>
             Employment status with choices such as ACTIVE, INACTIVE, LEFT, FIRED.
 
@@ -120,13 +152,25 @@ class Employee(models.Model):
         FIRED = "fired", _("Fired")
 
     user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="employee")
-    bank_account_number = models.IntegerField()
-    status = models.CharField(max_length=25, choices=Status, default=Status.ACTIVE)
+    bank_account_number = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=8, choices=Status, default=Status.ACTIVE, db_index=True)
 
     partner = models.ForeignKey(Partner, on_delete=models.CASCADE, related_name="employees", related_query_name="employee")
     branches = models.ManyToManyField('Branch', related_name="employees", related_query_name="employee")
     courses = models.ManyToManyField(Course, related_name="teachers", related_query_name="teacher")
 
+    class Meta:
+        """
+        Indexes for the filters of the employees list.
+
+        Attributes:
+            indexes (List): 
+                Partial index on `(partner, status)` for active employees, the most frequent filter inside a partner.
+        """
+        indexes = [
+            models.Index(fields=['partner', 'status'], name='employee_partner_active_idx', condition=Q(status='active')),
+        ]
+
     def __str__(self):
         """
         Returns the string representation of the employee.
@@ -137,7 +181,7 @@ class Employee(models.Model):
         return self.user.email
 
 
-class Branch(models.Model):
+class Branch(Address):
     """
     Represents a physical location, branch of a business partner, such as an office or educational center.
 
@@ -145,14 +189,20 @@ class Branch(models.Model):
         id (BigAutoField): Primary key.
         name (CharField): Name of the branch.
         opening_date (DateField): Date when the branch was opened.
-        country (CharField): Country of the branch.
-        region (CharField): Region of the branch.
-        city (CharField): City of the branch.
-        street (CharField): Street of the branch.
-        house (PositiveSmallIntegerField): House number.
+        country (CharField): Country of the branch. <br>
+            (Inherited from `Address`)
+        region (CharField): Region of the branch. <br>
+            (Inherited from `Address`)
+        city (CharField): City of the branch. <br>
+            (Inherited from `Address`)
+        street (CharField): Street of the branch. <br>
+            (Inherited from `Address`)
+        house (PositiveSmallIntegerField): House number. <br>
+            (Inherited from `Address`)
         floor (PositiveSmallIntegerField): Floor number.
         address_note (CharField): (__Optional__) <br>
-            Additional address details.
+            Additional address details. <br>
+            (Inherited from `Address`)
         status (CharField): (__Optional, Default: 'ACTIVE'__) <br>
             Operational status of the branch, can be ACTIVE or INACTIVE.
         area (PositiveSmallIntegerField): Size of the branch in square meters.
@@ -186,17 +236,24 @@ class Branch(models.Model):
     name = models.CharField(max_length=100)
     opening_date = models.DateField()
     partner = models.ForeignKey(Partner, on_delete=models.CASCADE, related_name="branches", related_query_name="branch")
-    status = models.CharField(max_length=25, choices=Status, default=Status.ACTIVE)
+    status = models.CharField(max_length=8, choices=Status, default=Status.ACTIVE, db_index=True)
     note = models.TextField(blank=True, null=True)
     area = models.PositiveSmallIntegerField()
-
-    country = models.CharField(max_length=50)
-    region = models.CharField(max_length=100)
-    city = models.CharField(max_length=50)
-    street = models.CharField(max_length=50)
-    house = models.PositiveSmallIntegerField()
     floor = models.PositiveSmallIntegerField()
-    address_note = models.CharField(max_length=150, blank=True, null=True)
+
+    class Meta:
+        """
+        Indexes for the filters and the ordering of the branches list.
+
+        Attributes:
+            indexes (List): 
+                Partial index on `(partner, status)` for active branches, the most frequent filter inside a partner. <br>
+                Index on `(-opening_date, -id)`, the ordering of the branches list pages.
+        """
+        indexes = [
+            models.Index(fields=['partner', 'status'], name='branch_partner_active_idx', condition=Q(status='active')),
+            models.Index(fields=['-opening_date', '-id'], name='branch_opening_date_idx'),
+        ]
 
     def __str__(self):
         """
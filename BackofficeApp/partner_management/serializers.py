@@ -1,21 +1,31 @@
 from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.query import prefetch_related_objects
 from rest_framework import serializers
 from drf_writable_nested.serializers import WritableNestedModelSerializer
 from drf_writable_nested.mixins import UniqueFieldsMixin
 from .models import Partner, Employee, Branch
+from user_management.models import User
 from user_management.serializers import UserSerializer
+from BackofficeApp.serializers import CachedFieldsMixin
 
 
-class PartnerSerializer(serializers.ModelSerializer):
+# Translatable labels of the statuses, translated to the request language on `str()`.
+partner_status_display = dict(Partner.Status.choices)
+employee_status_display = dict(Employee.Status.choices)
+branch_status_display = dict(Branch.Status.choices)
+
+
+class PartnerSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Partner model.
     Validates that the owner of the partner is in the 'owner' group. 
-    Excludes 'courses' from serialization.
 
     Attributes: Meta
         model (`django.db.models.Model`): `Partner` model to serialize.
-        exclude (List): `['courses']` <br>
-            all fields of the model to serialize except `courses`.
+        fields (List): `__all__` <br>
+            all fields of the model to serialize.
 
     Methods:
         validate: 
@@ -25,7 +35,7 @@ class PartnerSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = Partner
-        exclude = ['courses']
+        fields = '__all__'
 
     def validate(self, data):
         """
@@ -40,7 +50,7 @@ class PartnerSerializer(serializers.ModelSerializer):
         Raises:
             ValidationError: If the owner is not in the 'owner' group.
         """
-        if 'owner' in data and not data['owner'].groups.filter(name='owner').exists():
+        if 'owner' in data and 'owner' not in data['owner'].group_names:
             raise serializers.ValidationError("Owner must be in an owner group.")
         return super().validate(data)
     
@@ -56,77 +66,144 @@ class PartnerSerializer(serializers.ModelSerializer):
             (dict): A dictionary representing the serialized Partner instance.
         """
         representation = super().to_representation(instance)
-        representation['status'] = instance.get_status_display()
+        representation['status'] = str(partner_status_display.get(instance.status, instance.status))
         return representation
 
   
-class PartnerDetailSerializer(serializers.ModelSerializer):
+class PartnerDetailSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Detailed serializer for Partner model, providing counts of related branches and employees.
-    Excludes 'courses' from serialization.
 
     Attributes:
-        quantity_of_branches (SerializerMethodField): 
-            Number of partner's branches.
-        quantity_of_employees (SerializerMethodField): 
-            Number of partner's employees.
+        quantity_of_branches (IntegerField): 
+            Number of partner's branches. <br>
+            Read from the `quantity_of_branches` annotation of the queryset.
+        quantity_of_employees (IntegerField): 
+            Number of partner's employees. <br>
+            Read from the `quantity_of_employees` annotation of the queryset.
 
     Methods:
-        get_quantity_of_branches:
-            Counts the branches associated with the partner.
-        get_quantity_of_employees:
-            Counts the employees associated with the partner.
         to_representation: 
             Translates the 'status' field.
     """
-    quantity_of_branches = serializers.SerializerMethodField()
-    quantity_of_employees = serializers.SerializerMethodField()
+    quantity_of_branches = serializers.IntegerField(read_only=True)
+    quantity_of_employees = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Partner 
-        exclude = ['courses']
+        fields = '__all__'
 
-    def get_quantity_of_branches(self, obj):
+    def to_representation(self, instance):
         """
-        Return the count of branches associated with the partner.
+        Convert a Partner instance into a dictionary format that can be serialized. <br>
+        Translate the 'status' field by the language of the request. Default is 'en'. 
 
         Args:
-            obj (Partner): The `Partner` instance.
+            instance (Partner): The Partner instance to be serialized.
 
         Returns:
-            (int): Number of branches.
+            (dict): A dictionary representing the serialized Partner instance.
         """
-        return obj.branches.count()
+        representation = super().to_representation(instance)
+        representation['status'] = str(partner_status_display.get(instance.status, instance.status))
+        return representation
+
+
+class PartnerListSerializer(PartnerDetailSerializer):
+    """
+    Serializer for the list of partners. <br>
+    Same as `PartnerDetailSerializer` but without the `information` field, so the list doesn't load it for every partner.
 
-    def get_quantity_of_employees(self, obj):
+    Attributes: Meta
+        model (`django.db.models.Model`): `Partner` model to serialize.
+        exclude (List): `['information']` <br>
+            all fields of the model to serialize except `information`.
+    """
+    class Meta:
+        model = Partner
+        exclude = ['information']
+
+
+class EmployeeListSerializer(serializers.ListSerializer):
+    """
+    List serializer for bulk creation of employees with their users. <br>
+    Users, employees and their many-to-many rows are inserted with one `bulk_create` per table 
+        instead of saving every nested user and employee separately.
+
+    Methods:
+        validate: 
+            Ensures that emails and phone numbers are unique within the list and in the database.
+        create: 
+            Creates users, employees and their relations in bulk.
+    """
+    def validate(self, attrs):
         """
-        Return the count of employees associated with the partner.
+        Validate that emails and phone numbers of the new users are unique. <br>
+        Unique validators of the nested user are moved to the save stage by `UniqueFieldsMixin`, 
+            so for the whole list they are checked here with a single query.
 
         Args:
-            obj (Partner): The `Partner` instance.
+            attrs (list): Validated data of the employees.
 
         Returns:
-            (int): Number of employees.
+            (list): The validated data.
+
+        Raises:
+            ValidationError: If an email or a phone number is repeated or already taken.
         """
-        return obj.employees.count()
+        emails = [item['user']['email'].lower() for item in attrs]
+        phone_numbers = [item['user']['phone_number'] for item in attrs if item['user'].get('phone_number')]
 
-    def to_representation(self, instance):
+        if len(set(emails)) != len(emails) or len(set(phone_numbers)) != len(phone_numbers):
+            raise serializers.ValidationError("Emails and phone numbers must be unique.")
+        if User.objects.filter(Q(email__in=emails) | Q(phone_number__in=phone_numbers)).exists():
+            raise serializers.ValidationError("User with this email or phone number already exists.")
+        return attrs
+
+    def create(self, validated_data):
         """
-        Convert a Partner instance into a dictionary format that can be serialized. <br>
-        Translate the 'status' field by the language of the request. Default is 'en'. 
+        Creates users and employees in bulk inside a transaction. <br>
+        Users are prepared the same way as in `User.objects.create_user`.
 
         Args:
-            instance (Partner): The Partner instance to be serialized.
+            validated_data (list): Validated data of the employees.
 
         Returns:
-            (dict): A dictionary representing the serialized Partner instance.
+            (list): Created Employee instances with prefetched relations for the representation.
         """
-        representation = super().to_representation(instance)
-        representation['status'] = instance.get_status_display()
-        return representation
-
-
-class EmployeeSerializer(UniqueFieldsMixin, WritableNestedModelSerializer):
+        users_data, group_names = [], []
+        for item in validated_data:
+            user_data = dict(item['user'])
+            group_names.append(user_data.pop('group', None))
+            users_data.append(user_data)
+
+        with transaction.atomic():
+            users = User.objects.bulk_create_users(users_data, batch_size=500)
+            group_ids = dict(Group.objects.filter(name__in=set(group_names)).values_list('name', 'id'))
+            User.groups.through.objects.bulk_create([
+                User.groups.through(user_id=user.pk, group_id=group_ids[group_name])
+                for user, group_name in zip(users, group_names) if group_name
+            ], batch_size=500)
+
+            employees = [
+                Employee(user=user, **{k: v for k, v in item.items() if k not in ('user', 'branches', 'courses')})
+                for user, item in zip(users, validated_data)
+            ]
+            Employee.objects.bulk_create(employees, batch_size=500)
+            Employee.branches.through.objects.bulk_create([
+                Employee.branches.through(employee_id=employee.pk, branch_id=branch.pk)
+                for employee, item in zip(employees, validated_data) for branch in item.get('branches', [])
+            ], batch_size=500)
+            Employee.courses.through.objects.bulk_create([
+                Employee.courses.through(employee_id=employee.pk, course_id=course.pk)
+                for employee, item in zip(employees, validated_data) for course in item.get('courses', [])
+            ], batch_size=500)
+
+        prefetch_related_objects(employees, 'user__groups', 'branches', 'courses')
+        return employees
+
+
+class EmployeeSerializer(UniqueFieldsMixin, CachedFieldsMixin, WritableNestedModelSerializer):
     """
     Serializer for Employee model with nested User data.
     This serializer allows writable nested serialization(`WritableNestedModelSerializer`) 
@@ -141,6 +218,8 @@ class EmployeeSerializer(UniqueFieldsMixin, WritableNestedModelSerializer):
             all fields of the model to serialize.
         extra_kwargs (dict): Additional keyword arguments for fields configuration. <br>
             Makes `branches`, `courses` fields optional.
+        list_serializer_class (ListSerializer): `EmployeeListSerializer` <br>
+            Creates lists of employees in bulk.
 
     Methods:
         to_representation: 
@@ -151,6 +230,7 @@ class EmployeeSerializer(UniqueFieldsMixin, WritableNestedModelSerializer):
     class Meta:
         model = Employee
         fields = '__all__'
+        list_serializer_class = EmployeeListSerializer
         extra_kwargs = {
             'branches': {'required': False, 'allow_empty': True},
             'courses': {'required': False, 'allow_empty': True}
@@ -168,7 +248,7 @@ class EmployeeSerializer(UniqueFieldsMixin, WritableNestedModelSerializer):
             (dict): A dictionary representing the serialized Employee instance.
         """
         representation = super().to_representation(instance)
-        representation['status'] = instance.get_status_display()
+        representation['status'] = str(employee_status_display.get(instance.status, instance.status))
         return representation
 
 
@@ -179,12 +259,13 @@ class EmployeeSerializerForOwner(EmployeeSerializer):
 
     Methods:
         validate_user: Ensures that owner can't grant to employee superuser group.
-        create: Custom creation logic to assign the partner field based on the request's user.
+        validate: Assigns the partner owned by the request's user, for single and bulk creation.
     """
     class Meta:
         model = Employee
         fields = '__all__'
         read_only_fields = ['partner']
+        list_serializer_class = EmployeeListSerializer
         extra_kwargs = {
             'branches': {'required': False, 'allow_empty': True},
             'courses': {'required': False, 'allow_empty': True}
@@ -203,28 +284,29 @@ class EmployeeSerializerForOwner(EmployeeSerializer):
         Raises:
             ValidationError: If the user's group is a superuser.
         """
-        if value.get('group') and Group.objects.get(name='superuser') == value['group']:
+        if value.get('group') == 'superuser':
             raise serializers.ValidationError("Employee can't be a superuser.")
         return value
     
-    def create(self, validated_data):
+    def validate(self, data):
         """
-        Custom creation logic to assign the partner field based on the request's user.
+        Assigns the partner owned by the request's user to the employee. <br>
+        Done at validation, so both `create` and the bulk creation of `EmployeeListSerializer` get it.
 
         Args:
-            validated_data (dict): The raw validated data.
+            data (dict): Serialized data to validate.
 
         Returns:
-            (Employee): The newly created Employee instance.
+            (dict): The validated data with `partner`.
         """
-        request = self.context['request']
-        validated_data['partner'] = request.user.owned_partner
-        return super().create(validated_data)
+        data['partner'] = self.context['request'].user.owned_partner
+        return super().validate(data)
     
 
-class BranchSerializer(serializers.ModelSerializer):
+class BranchSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Branch model.
+    On writes only employees of the branch's partner can be assigned, others are rejected.
 
     Attributes:
         employees (PrimaryKeyRelatedField): __ManyToManyField from `Employee` model__ <br>
@@ -238,13 +320,15 @@ class BranchSerializer(serializers.ModelSerializer):
 
     Methods:
         validate: 
-            Ensure that assigned employees are valid under the current branch's partner.
+            Ensure that assigned employees belong to the branch's partner.
+        get_partner_id: 
+            Returns the id of the partner the branch belongs to after the write.
         to_representation: 
             Translates the 'status' field.
     """
     employees = serializers.PrimaryKeyRelatedField(
         many=True, 
-        queryset=Employee.objects.all(), 
+        queryset=Employee.objects.only('pk', 'partner'), 
         allow_null=True, 
         required=False
     )
@@ -254,25 +338,47 @@ class BranchSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         """
-        Ensure that assigned employees are valid under the current branch's partner.
-        If an employee is connected to another partner than the branch, it is removed from the list.
+        Ensure that assigned employees belong to the branch's partner. <br>
+        Runs after `partner` is validated, so the check compares the loaded employees' `partner_id` 
+            with the partner's pk without further queries.
 
         Args:
             data (dict): Serialized data to validate.
 
         Returns:
             (dict): The validated data.
-        """
-        partner = data.get('partner', self.instance.partner if self.instance else None)
-        employees_data = data.get('employees', self.instance.employees.all() if self.instance else Employee.objects.none())
 
-        if 'employees' not in data:
+        Raises:
+            ValidationError: If an employee is connected to another partner than the branch.
+        """
+        if not data.get('employees'):
             return data
-        
-        valid_employees = [employee for employee in employees_data if employee.partner == partner]
-        data['employees'] = valid_employees
+
+        partner_id = self.get_partner_id(data)
+        foreign = [employee.pk for employee in data['employees'] if employee.partner_id != partner_id]
+        if foreign:
+            raise serializers.ValidationError(
+                {'employees': f"Employees {', '.join(map(str, foreign))} don't belong to the partner of the branch."}
+            )
         return data
 
+    def get_partner_id(self, data):
+        """
+        Returns the id of the partner the branch belongs to after the write: 
+            the validated partner, otherwise the partner of the updated branch.
+
+        Args:
+            data (dict): Serialized data being validated.
+
+        Returns:
+            (int | None): Partner id, None if it's unknown.
+        """
+        if data.get('partner') is not None:
+            return data['partner'].pk
+        if isinstance(self.instance, Branch):
+            return self.instance.partner_id
+        return None
+
     def to_representation(self, instance):
         """
         Convert a Branch instance into a dictionary format that can be serialized. <br>
@@ -285,24 +391,32 @@ class BranchSerializer(serializers.ModelSerializer):
             (dict): A dictionary representing the serialized Branch instance.
         """
         representation = super().to_representation(instance)
-        representation['status'] = instance.get_status_display()
+        representation['status'] = str(branch_status_display.get(instance.status, instance.status))
         return representation
 
 
-    #that's filtering employees field and return representation with ids amd emails
-    #def __init__(self, *args, **kwargs):
-    #    super().__init__(*args, **kwargs)
-    #    if 'context' in kwargs and kwargs['context'].get('branch_id', None):
-    #        branch_id = kwargs['context']['branch_id']
-    #        partner = Branch.objects.get(pk=branch_id).partner
-    #        self.fields['employees'].queryset = Employee.objects.filter(partner=partner)
-
+    #that's return representation with ids amd emails of employees
     #def to_representation(self, instance):
     #    rep = super().to_representation(instance)
     #    rep['employees'] = [{'id': emp.user_id, 'name': str(emp)} for emp in instance.employees.all()]
     #    return rep
 
 
+class BranchListSerializer(BranchSerializer):
+    """
+    Serializer for the list of branches. <br>
+    Same as `BranchSerializer` but without the `note` field, so the list doesn't load notes of every branch.
+
+    Attributes: Meta
+        model (`django.db.models.Model`): `Branch` model to serialize.
+        exclude (List): `['note']` <br>
+            all fields of the model to serialize except `note`.
+    """
+    class Meta:
+        model = Branch
+        exclude = ['note']
+
+
 class BranchSerializerForOwner(BranchSerializer):
     """
     Branch serializer for owner use that automatically assigns the authenticated user's owned partner to the branch.
@@ -313,6 +427,7 @@ class BranchSerializerForOwner(BranchSerializer):
             all fields of the model to serialize except `partner`.
 
     Methods:
+        get_partner_id: Returns the id of the partner owned by the request's user.
         create: Custom creation logic to assign the partner field based on the request's user.
     """
     class Meta:
@@ -320,6 +435,18 @@ class BranchSerializerForOwner(BranchSerializer):
         fields = '__all__'
         read_only_fields = ['partner']
 
+    def get_partner_id(self, data):
+        """
+        Returns the id of the partner owned by the request's user, `partner` is read-only for owners.
+
+        Args:
+            data (dict): Serialized data being validated.
+
+        Returns:
+            (int): Partner id.
+        """
+        return self.context['request'].user.owned_partner.pk
+
     def create(self, validated_data):
         """
         Custom creation logic to assign the partner field based on the request's user.
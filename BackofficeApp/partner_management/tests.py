@@ -1,3 +1,211 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, Permission
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .models import Partner, Employee, Branch
+from user_management.models import User
+
+
+def create_partner(name):
+    """
+    Creates a partner with the required address fields filled.
+
+    Args:
+        name (str): Name of the partner.
+
+    Returns:
+        (Partner): The created partner.
+    """
+    return Partner.objects.create(
+        name=name, legal_entity=f"{name} LLC", country='Ukraine', region='Kyiv', city='Kyiv', street='Main', house=1
+    )
+
+
+class EmployeeBulkCreateTests(APITestCase):
+    """
+    Tests of the bulk creation of employees through `EmployeeListSerializer`.
+    """
+    url = '/api/employees/bulk/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser('superuser@gmail.com', 'superuser')
+        cls.teacher_group = Group.objects.create(name='teacher')
+        cls.partner = create_partner('Partner')
+
+    def setUp(self):
+        self.client.force_authenticate(self.superuser)
+
+    def employee_data(self, email, phone_number=None):
+        return {
+            'user': {'email': email, 'password': 'password', 'phone_number': phone_number, 'group': 'teacher'},
+            'bank_account_number': 1234567890,
+            'partner': self.partner.pk,
+        }
+
+    def test_creates_users_and_employees(self):
+        data = [self.employee_data('First@gmail.com', 380000000001), self.employee_data('second@gmail.com')]
+
+        response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 2)
+        employees = Employee.objects.select_related('user').filter(partner=self.partner).order_by('user__email')
+        self.assertEqual([employee.user.email for employee in employees], ['first@gmail.com', 'second@gmail.com'])
+        for employee in employees:
+            self.assertTrue(employee.user.check_password('password'))
+            self.assertEqual(list(employee.user.groups.all()), [self.teacher_group])
+
+    def test_rejects_repeated_emails(self):
+        data = [self.employee_data('same@gmail.com'), self.employee_data('SAME@gmail.com')]
+
+        response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(User.objects.filter(email='same@gmail.com').exists())
+
+    def test_rejects_repeated_phone_numbers(self):
+        data = [self.employee_data('first@gmail.com', 380000000001), self.employee_data('second@gmail.com', 380000000001)]
+
+        response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Employee.objects.exists())
+
+    def test_rejects_taken_email(self):
+        User.objects.create_user('taken@gmail.com', 'password')
+        data = [self.employee_data('new@gmail.com'), self.employee_data('Taken@gmail.com')]
+
+        response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(User.objects.filter(email='new@gmail.com').exists())
+        self.assertFalse(Employee.objects.exists())
+
+    def test_rejects_invalid_item(self):
+        data = [self.employee_data('first@gmail.com'), self.employee_data('not-an-email')]
+
+        response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Employee.objects.exists())
+
+
+def create_employee(email, partner):
+    """
+    Creates an employee of the partner with a new user.
+
+    Args:
+        email (str): Email of the employee's user.
+        partner (Partner): Partner of the employee.
+
+    Returns:
+        (Employee): The created employee.
+    """
+    return Employee.objects.create(user=User.objects.create_user(email), bank_account_number=1234567890, partner=partner)
+
+
+class BranchEmployeesTests(APITestCase):
+    """
+    Tests that branches only accept employees of their partner, checked against the validated partner.
+    """
+    url = '/api/branches/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser('superuser@gmail.com', 'superuser')
+        cls.partner = create_partner('Partner')
+        cls.other_partner = create_partner('Other partner')
+        cls.employee = create_employee('employee@gmail.com', cls.partner)
+        cls.other_employee = create_employee('other@gmail.com', cls.other_partner)
+        cls.branch = Branch.objects.create(
+            name='Branch', opening_date='2024-01-01', partner=cls.partner, area=100, floor=1,
+            country='Ukraine', region='Kyiv', city='Kyiv', street='Main', house=1
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.superuser)
+
+    def branch_data(self, partner, employees):
+        return {
+            'name': 'New branch', 'opening_date': '2024-01-01', 'partner': partner, 'employees': employees,
+            'area': 100, 'floor': 1,
+            'country': 'Ukraine', 'region': 'Kyiv', 'city': 'Kyiv', 'street': 'Main', 'house': 2,
+        }
+
+    def test_creates_branch_with_employees_of_partner(self):
+        response = self.client.post(self.url, self.branch_data(self.partner.pk, [self.employee.pk]), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(list(Branch.objects.get(pk=response.data['id']).employees.all()), [self.employee])
+
+    def test_rejects_employees_of_another_partner(self):
+        data = self.branch_data(self.partner.pk, [self.employee.pk, self.other_employee.pk])
+
+        response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('employees', response.data)
+        self.assertFalse(Branch.objects.filter(name='New branch').exists())
+
+    def test_update_checks_employees_against_branch_partner(self):
+        response = self.client.patch(f"{self.url}{self.branch.pk}/", {'employees': [self.other_employee.pk]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('employees', response.data)
+        self.assertFalse(self.branch.employees.exists())
+
+    def test_update_checks_employees_against_new_partner(self):
+        data = {'partner': self.other_partner.pk, 'employees': [self.other_employee.pk]}
+
+        response = self.client.patch(f"{self.url}{self.branch.pk}/", data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(self.branch.employees.all()), [self.other_employee])
+
+    def test_rejects_malformed_partner(self):
+        for partner in ('abc', [self.partner.pk], {'id': self.partner.pk}):
+            with self.subTest(partner=partner):
+                response = self.client.post(self.url, self.branch_data(partner, [self.employee.pk]), format='json')
+
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn('partner', response.data)
+
+    def test_owner_rejects_employees_of_another_partner(self):
+        owner = User.objects.create_user('owner@gmail.com')
+        owner.groups.add(Group.objects.create(name='owner'))
+        owner.user_permissions.add(Permission.objects.get(codename='add_branch'))
+        self.other_partner.owner = owner
+        self.other_partner.save()
+        self.client.force_authenticate(owner)
+
+        response = self.client.post(self.url, self.branch_data(None, [self.employee.pk]), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('employees', response.data)
+
+
+class EmployeeQueriesTests(APITestCase):
+    """
+    Tests that only actions serializing employees eager load their relations.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser('superuser@gmail.com', 'superuser')
+        cls.partner = create_partner('Partner')
+        cls.employee = create_employee('employee@gmail.com', cls.partner)
+
+    def setUp(self):
+        self.client.force_authenticate(self.superuser)
+
+    def test_destroy_loads_only_employee_with_user(self):
+        url = f"/api/employees/{self.employee.pk}/"
+        with mock.patch('django.db.models.query.prefetch_related_objects') as prefetch:
+            response = self.client.delete(url)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        prefetch.assert_not_called()
+        self.assertFalse(Employee.objects.exists())
+        self.assertFalse(User.objects.filter(email='employee@gmail.com').exists())
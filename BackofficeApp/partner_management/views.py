@@ -1,28 +1,89 @@
-from datetime import datetime
-from django.db.models.query import prefetch_related_objects
-from django.db.models import Q
+from datetime import date
+from django.db.models import Q, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
+from BackofficeApp.mixins import AutoPrefetchMixin
 from .models import Partner, Employee, Branch
 from .serializers import *
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser  
 
 
-class PartnerViewSet(viewsets.ModelViewSet):
+def count_per_partner(model):
+    """
+    Builds a subquery counting rows of the model that belong to the partner of the outer query. <br>
+    Used instead of `Count()` over joins, which multiplies branches by employees and 
+        is narrowed by the joins of the filters.
+
+    Args:
+        model (Model): Model with a `partner` foreign key.
+
+    Returns:
+        (Subquery): Count of the partner's rows, 0 if there are none.
+    """
+    counts = model.objects.filter(partner=OuterRef('pk')).order_by().values('partner').annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counts), 0)
+
+
+class PartnerCursorPagination(CursorPagination):
+    """
+    Keyset pagination for partners. <br>
+    Pages are fetched by `id < last seen id` instead of OFFSET and without counting all rows. <br>
+    `creating_date` is set on insert, so for created partners the ID order matches it and newest partners come first.
+
+    Attributes:
+        ordering (str): Partners are ordered by their ID, newest first.
+    """
+    ordering = '-id'
+
+
+class EmployeeCursorPagination(CursorPagination):
+    """
+    Keyset pagination for employees. <br>
+    Pages are fetched by `user_id > last seen user_id` instead of OFFSET and without counting all rows.
+
+    Attributes:
+        ordering (str): Employees are ordered by their user ID.
+    """
+    ordering = 'user_id'
+
+
+class BranchCursorPagination(CursorPagination):
+    """
+    Keyset pagination for branches. <br>
+    Pages are fetched by `id < last seen id` instead of OFFSET and without counting all rows. <br>
+    The cursor is built from the first ordering field only, so the non-unique `opening_date` can't be used.
+
+    Attributes:
+        ordering (str): Branches are ordered by their ID, latest added first.
+    """
+    ordering = '-id'
+
+
+class PartnerViewSet(AutoPrefetchMixin, viewsets.ModelViewSet):
     """
     Viewset to manage partners.
 
+    Attributes:
+        pagination_class (CursorPagination): `PartnerCursorPagination`.
+
     Methods:
         get_serializer_class:
             Determines the serializer class based on the action and user role.
         get_queryset:
             Customizes the queryset based on user group and multiple filters like search, status and date.
     """
+    pagination_class = PartnerCursorPagination
+
     def get_queryset(self):
         """
-        Customizes the queryset retrieval for partners based on user group and filters, ordered by their creation date. <br>
+        Customizes the queryset retrieval for partners based on user group and filters, newest first. <br>
         If the user is a teacher, it will return partner filtered to only that user is part of. <br>
         If the user is a owner, it will return partner filtered to only that user owns.
+        For `list` and `retrieve` annotates the numbers of partner's branches and employees.
+        For `list` action the `information` field isn't loaded.
 
         Attributes: Filters
             search (str): Filters partners by name or legal entity. <br> Case-insensitive.
@@ -38,11 +99,11 @@ class PartnerViewSet(viewsets.ModelViewSet):
         Returns:
             (QuerySet): A customized queryset of Partner objects.
         """
-        queryset = Partner.objects.all().order_by('-creating_date')
+        queryset = Partner.objects.all().order_by('-id')
 
-        if self.request.user.groups.filter(name='teacher').exists():
+        if 'teacher' in self.request.user.group_names:
             queryset = queryset.filter(employee__user=self.request.user)
-        elif self.request.user.groups.filter(name='owner').exists():
+        elif 'owner' in self.request.user.group_names:
             queryset = queryset.filter(owner=self.request.user)
 
         search = self.request.query_params.get('search', None)
@@ -54,8 +115,15 @@ class PartnerViewSet(viewsets.ModelViewSet):
         if status:
             queryset = queryset.filter(status=status)
         if date_str:
-            date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            queryset = queryset.filter(creating_date=date)
+            queryset = queryset.filter(creating_date=date.fromisoformat(date_str))
+
+        if self.action == 'list':
+            queryset = queryset.defer('information')
+        if self.action in ['list', 'retrieve']:
+            queryset = queryset.annotate(
+                quantity_of_branches=count_per_partner(Branch),
+                quantity_of_employees=count_per_partner(Employee),
+            )
 
         return queryset
 
@@ -65,19 +133,23 @@ class PartnerViewSet(viewsets.ModelViewSet):
 
         Returns:
             PartnerSerializer (ModelSerializer): For actions `create`, `update`, `partial_update`, `destroy`.
-            PartnerDetailSerializer (ModelSerializer): For actions `list`, `retrieve`.
+            PartnerListSerializer (ModelSerializer): For action `list`.
+            PartnerDetailSerializer (ModelSerializer): For action `retrieve`.
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action == 'list':
+            return PartnerListSerializer
+        if self.action == 'retrieve':
             return PartnerDetailSerializer
         return PartnerSerializer
 
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(AutoPrefetchMixin, viewsets.ModelViewSet):
     """
     Viewset to manage employees.
 
     Attributes:
         parser_classes (tuple): Parsers for JSON, multipart, and form data.
+        pagination_class (CursorPagination): `EmployeeCursorPagination`.
 
     Methods:
         get_queryset: 
@@ -88,8 +160,11 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             Custom update logic that helps to update related to employee user instance.
         destroy: 
             Custom destroy method to delete both employee and related user.
+        bulk: 
+            Creates a list of employees with their users in bulk.
     """
     parser_classes = (JSONParser, MultiPartParser, FormParser)
+    pagination_class = EmployeeCursorPagination
 
     def get_serializer_class(self):
         """
@@ -99,7 +174,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             EmployeeSerializer (ModelSerializer): Default.
             EmployeeSerializerForOwner (ModelSerializer): If the user belongs to the 'owner' group.
         """
-        if self.request.user.groups.filter(name='owner').exists():
+        if 'owner' in self.request.user.group_names:
             return EmployeeSerializerForOwner
         return EmployeeSerializer
 
@@ -108,6 +183,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         Customizes the queryset retrieval for employees based on user roles and filters. <br>
         If the user is a teacher, it will return filtered employees from the same partner.
         If the user is an owner, it will return filtered employees from their partner instance.
+        For `list` and `retrieve` groups of the users are prefetched, other actions load only the user.
 
         Attributes: Filters
             partner_id (int): Filters employees by the partner id.
@@ -125,11 +201,17 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         Returns:
             (QuerySet): A filtered queryset of Employee objects.
         """
-        queryset = Employee.objects.all().order_by('user_id')
-
-        if self.request.user.groups.filter(name='teacher').exists():
+        queryset = Employee.objects.order_by('user_id')
+        if self.action in self.auto_prefetch_actions:
+            # groups are read in UserSerializer.to_representation, other relations are eager loaded by AutoPrefetchMixin
+            queryset = queryset.prefetch_related('user__groups')
+        else:
+            # update and destroy work with the user of the single employee only
+            queryset = queryset.select_related('user')
+
+        if 'teacher' in self.request.user.group_names:
             queryset = queryset.filter(partner=self.request.user.employee.partner)
-        elif self.request.user.groups.filter(name='owner').exists():
+        elif 'owner' in self.request.user.group_names:
             queryset = queryset.filter(partner=self.request.user.owned_partner)
 
         partner_id = self.request.query_params.get('partner_id', None)
@@ -143,14 +225,15 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         if course_id:
             queryset = queryset.filter(courses__id=course_id)
         if search:
-            search_terms = search.split()
-            for term in search_terms:
-                queryset = queryset.filter(
+            search_q = Q()
+            for term in search.split():
+                search_q &= (
                     Q(user__first_name__icontains=term) | 
                     Q(user__last_name__icontains=term) | 
                     Q(user__patronymic__icontains=term) |
                     Q(user__email__icontains=term)
                 )
+            queryset = queryset.filter(search_q)
         if status:
             queryset = queryset.filter(status=status)
         if group:
@@ -182,19 +265,18 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
 
-        queryset = self.filter_queryset(self.get_queryset())
-        if queryset._prefetch_related_lookups:
+        if getattr(instance, '_prefetched_objects_cache', None):
             # If 'prefetch_related' has been applied to a queryset, we need to
             # forcibly invalidate the prefetch cache on the instance,
-            # and then re-prefetch related objects
+            # the serializer loads the relations of the single instance again
             instance._prefetched_objects_cache = {}
-            prefetch_related_objects([instance], *queryset._prefetch_related_lookups)
 
         return Response(serializer.data)
 
     def destroy(self, request, *args, **kwargs):
         """
-        Custom destroy method to delete both the employee and related user data.
+        Custom destroy method to delete both the employee and related user data. <br>
+        The user is loaded together with the employee (`select_related` of `get_queryset`), the employee is removed by the cascade.
 
         Args:
             request (Request): The HTTP request object.
@@ -205,39 +287,56 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             (Response): A Response object with HTTP status indicating the outcome.
         """
         employee = self.get_object()
-        user = employee.user
-        #employee.delete()
-        user.delete()
+        employee.user.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Creates a list of employees with their users. <br>
+        Each table is written with a single bulk insert (`EmployeeListSerializer`).
+
+        Args:
+            request (Request): The HTTP request object with a list of employees.
+
+        Returns:
+            (Response): 
+                201 HTTP response with the created employees. <br>
+                400 HTTP response if any of the employees is invalid, nothing is created then.
+        """
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
     
 
-class BranchViewSet(viewsets.ModelViewSet):
+class BranchViewSet(AutoPrefetchMixin, viewsets.ModelViewSet):
     """
     Viewset to manage branches.
 
+    Attributes:
+        pagination_class (CursorPagination): `BranchCursorPagination`.
+
     Methods:
         get_queryset: 
-            Customizes the queryset of Branches ordered by their opening date based on user group and filters.
+            Customizes the queryset of Branches, latest added first, based on user group and filters.
         get_serializer_class: 
             Determines the serializer class based on the user's group.
     """
+    pagination_class = BranchCursorPagination
 
-    #that's for filtering employees for branch in serializer
-    #def get_serializer_context(self):
-    #    context = super().get_serializer_context()
-    #    if 'pk' in self.kwargs:
-    #        context['branch_id'] = self.kwargs['pk']
-    #    return context
-    
     def get_serializer_class(self):
         """
         Determines the serializer class based on the user's group.
 
         Returns:
             BranchSerializer (ModelSerializer): Default.
+            BranchListSerializer (ModelSerializer): For `list` action.
             BranchSerializerForOwner (ModelSerializer): If the user belongs to the 'owner' group.
         """
-        if self.request.user.groups.filter(name='owner').exists():
+        if self.action == 'list':
+            return BranchListSerializer
+        if 'owner' in self.request.user.group_names:
             return BranchSerializerForOwner
         return BranchSerializer
 
@@ -246,6 +345,7 @@ class BranchViewSet(viewsets.ModelViewSet):
         Customizes the queryset retrieval for branches based on user roles and filters. <br>
         If the user is a teacher, it will return filtered branches from the same partner.
         If the user is an owner, it will return filtered branches from their partner instance.
+        For `list` action the `note` field isn't loaded.
 
         Attributes: Filters
             partner_id (str): Filters branches by partner id.
@@ -262,11 +362,11 @@ class BranchViewSet(viewsets.ModelViewSet):
         Returns:
             (QuerySet): A filtered queryset of Branches objects.
         """
-        queryset = Branch.objects.all().order_by('-opening_date')
+        queryset = Branch.objects.all().order_by('-id')
 
-        if self.request.user.groups.filter(name='teacher').exists():
+        if 'teacher' in self.request.user.group_names:
             queryset = queryset.filter(partner=self.request.user.employee.partner)
-        elif self.request.user.groups.filter(name='owner').exists():
+        elif 'owner' in self.request.user.group_names:
             queryset = queryset.filter(partner=self.request.user.owned_partner)
 
         partner_id = self.request.query_params.get('partner_id', None)
@@ -281,7 +381,9 @@ class BranchViewSet(viewsets.ModelViewSet):
         if status:
             queryset = queryset.filter(status=status)
         if date_str:
-            date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            queryset = queryset.filter(opening_date=date)
+            queryset = queryset.filter(opening_date=date.fromisoformat(date_str))
+
+        if self.action == 'list':
+            queryset = queryset.defer('note')
 
         return queryset
\ No newline at end of file
@@ -23,7 +23,9 @@ class CustomUserAdmin(UserAdmin):
     form = CustomUserChangeForm
     model = User
     list_display = ('email', 'first_name', 'last_name', 'gender')
-    list_filter = ('email', 'first_name', 'last_name', 'gender')
+    list_filter = ('gender', 'is_active', 'groups')
+    list_per_page = 50
+    show_full_result_count = False
 
     """
     fieldsets = (
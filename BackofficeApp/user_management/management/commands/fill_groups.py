@@ -4,6 +4,40 @@ from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
 from partner_management.models import Employee, Branch
 
+
+# (app label, codename), permission codenames are unique only within the content type
+OWNER_PERMISSIONS = (
+    ('course_management', 'view_course'),
+    ('course_management', 'change_course'), # only teacher list
+    ('course_management', 'view_lesson'),
+    ('course_management', 'view_category'),
+
+    ('partner_management', 'view_partner'),
+    ('partner_management', 'change_partner'),
+
+    ('partner_management', 'add_branch'),
+    ('partner_management', 'view_branch'),
+    ('partner_management', 'change_branch'),
+    ('partner_management', 'delete_branch'),
+
+    ('partner_management', 'add_employee'),
+    ('partner_management', 'view_employee'),
+    ('partner_management', 'change_employee'),
+    ('partner_management', 'delete_employee'),
+)
+
+TEACHER_PERMISSIONS = (
+    ('course_management', 'view_course'),
+    ('course_management', 'view_lesson'),
+    ('course_management', 'view_category'),
+    ('partner_management', 'view_employee'),
+    ('partner_management', 'view_branch'),
+    ('partner_management', 'view_partner'),
+)
+
+PERMISSIONS = tuple(dict.fromkeys(OWNER_PERMISSIONS + TEACHER_PERMISSIONS))
+
+
 class Command(BaseCommand):
     """
     Django management command to set up and assign permissions to predefined user groups.
@@ -59,58 +93,36 @@ class Command(BaseCommand):
         """
         self.stdout.write(self.style.SUCCESS('Setting up permissions for groups...'))
         try:
-            # Retrieve permission instances 
-            view_course = Permission.objects.get(codename='view_course')
-            change_course = Permission.objects.get(codename='change_course')
-
-            view_lesson = Permission.objects.get(codename='view_lesson')
-
-            view_category = Permission.objects.get(codename='view_category')
-
-            change_partner = Permission.objects.get(codename='change_partner')
-            view_partner = Permission.objects.get(codename='view_partner')
-
-            add_branch = Permission.objects.get(codename='add_branch')
-            view_branch = Permission.objects.get(codename='view_branch')
-            change_branch = Permission.objects.get(codename='change_branch')
-            delete_branch = Permission.objects.get(codename='delete_branch')
-
-            add_employee = Permission.objects.get(codename='add_employee')
-            view_employee = Permission.objects.get(codename='view_employee')
-            change_employee = Permission.objects.get(codename='change_employee')
-            delete_employee = Permission.objects.get(codename='delete_employee')
-
-            # Setup permissions for owner group
-            owner_group = Group.objects.get(name="owner")
-            owner_group.permissions.add(
-                view_course, 
-                change_course, # only teacher list
-                view_lesson, 
-                view_category,
-                
-                view_partner,
-                change_partner,
-
-                add_branch,
-                view_branch,
-                change_branch,
-                delete_branch,
-
-                add_employee,
-                view_employee,
-                change_employee,
-                delete_employee
-            )
-            
-            # Setup permissions for teacher group
-            teacher_group = Group.objects.get(name="teacher")
-            teacher_group.permissions.add(
-                view_course, 
-                view_lesson,
-                view_category,
-                view_employee,
-                view_branch,
-                view_partner
+            # Retrieve ids of all permissions with one query, 
+            # pairs of app label and codename match the unique (content_type, codename) index
+            permission_ids = {
+                (app_label, codename): pk
+                for app_label, codename, pk in Permission.objects.filter(
+                    content_type__app_label__in={app_label for app_label, _ in PERMISSIONS},
+                    codename__in={codename for _, codename in PERMISSIONS}
+                ).values_list('content_type__app_label', 'codename', 'pk')
+            }
+            missing = [permission for permission in PERMISSIONS if permission not in permission_ids]
+            if missing:
+                raise Permission.DoesNotExist(f'Permission matching (app label, codename) {missing} does not exist.')
+
+            # Retrieve both groups with one query
+            groups = Group.objects.in_bulk(['owner', 'teacher'], field_name='name')
+            missing = [name for name in ('owner', 'teacher') if name not in groups]
+            if missing:
+                raise Group.DoesNotExist(f'Group matching name {missing} does not exist.')
+
+            # Setup permissions for owner and teacher groups with one insert, rows that already exist are skipped
+            GroupPermission = Group.permissions.through
+            GroupPermission.objects.bulk_create(
+                [
+                    GroupPermission(group=groups['owner'], permission_id=permission_ids[permission])
+                    for permission in OWNER_PERMISSIONS
+                ] + [
+                    GroupPermission(group=groups['teacher'], permission_id=permission_ids[permission])
+                    for permission in TEACHER_PERMISSIONS
+                ],
+                ignore_conflicts=True
             )
 
             self.stdout.write(self.style.SUCCESS('Successfully set up permissions for groups!'))
@@ -1,19 +1,79 @@
 from django.core.management.base import BaseCommand, CommandError
 from django.core.management import call_command
-from django.core.files import File
 from django.core.files.storage import default_storage
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import connection, transaction
 from django.contrib.auth.models import Group
-from django.db.models import Q
+from django.contrib.auth.hashers import make_password
 from user_management.models import User
 from partner_management.models import Employee
 from course_management.models import Course, Category, Lesson
-import random
+from concurrent.futures import ThreadPoolExecutor
+import random, mimetypes
 
 
 def upload_file_to_minio(file_path, storage_path):
-    with open("user_management/management/commands/"+file_path, "rb") as file:
-        django_file = File(file)
-        return default_storage.save(storage_path, django_file)
+    """
+    Uploads a local file straight to the storage bucket. <br>
+    boto3 streams the file from disk in multipart chunks, without the Django `File` wrapper
+        and the name availability check of `default_storage.save`, an existing object is overwritten.
+
+    Args:
+        file_path (str): Path of the file relative to the command directory.
+        storage_path (str): Name of the file in the storage.
+
+    Returns:
+        (str): Name of the file in the storage.
+    """
+    content_type, _ = mimetypes.guess_type(storage_path)
+    default_storage.bucket.upload_file(
+        "user_management/management/commands/" + file_path,
+        storage_path,
+        ExtraArgs={'ContentType': content_type or 'application/octet-stream'},
+        Config=default_storage.transfer_config
+    )
+    return storage_path
+
+
+def bulk_loaddata(*fixture_names):
+    """
+    Loads JSON fixtures of `user_management/fixtures/` with one `bulk_create` per model,
+        instead of a save per object like `loaddata`. <br>
+    Objects keep primary keys and dates of `auto_now` fields from the fixtures, 
+        sequences of the loaded models are reset afterwards like `loaddata` does. <br>
+    Foreign keys are checked at the end of the transaction, so models are inserted in the order they appear. <br>
+    Many-to-many values of fixtures aren't loaded, fixtures of the project have none.
+
+    Args:
+        fixture_names (str): File names of the fixtures.
+    """
+    objects = {}
+    for fixture_name in fixture_names:
+        with open("user_management/fixtures/" + fixture_name, encoding="utf-8") as fixture:
+            for deserialized in serializers.deserialize("json", fixture):
+                objects.setdefault(type(deserialized.object), []).append(deserialized.object)
+
+    for model, instances in objects.items():
+        # `bulk_create` sets `auto_now` fields to the current time, fixture values are written back after it
+        auto_fields = [
+            field.attname for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+        ]
+        fixture_values = [[getattr(instance, name) for name in auto_fields] for instance in instances]
+
+        model.objects.bulk_create(instances, batch_size=1000)
+
+        if auto_fields:
+            for instance, values in zip(instances, fixture_values):
+                for name, value in zip(auto_fields, values):
+                    if value is not None:
+                        setattr(instance, name, value)
+            model.objects.bulk_update(instances, auto_fields, batch_size=1000)
+
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), list(objects)):
+            cursor.execute(sql)
 
 
 class Command(BaseCommand):
@@ -41,6 +101,7 @@ class Command(BaseCommand):
         Creates employees and branches for each partner. <br>
         Sets categories to course instances. <br>
         Call command `fill_groups` to set up permissions to each group.
+        Everything after migrations runs in a single transaction and is committed once.
 
         Raises:
             CommandError: Raised if there is an issue with loading fixtures, setting up initial configurations,
@@ -53,134 +114,149 @@ class Command(BaseCommand):
         call_command('migrate')
 
 
-        self.stdout.write(self.style.SUCCESS('Loading groups and setting permissions...'))
-        try:
-            call_command('loaddata', 'groups.json')  # 3 groups: superuser, owner, teacher
-            call_command('fill_groups')
-        except Exception as e:
-            raise CommandError(f'Failed to load groups and fill them with permissions: {e}')
-
-        superuser_group = Group.objects.get(name="superuser")
-        owner_group = Group.objects.get(name="owner")
-        teacher_group = Group.objects.get(name="teacher")
-
-
-        self.stdout.write(self.style.SUCCESS('Loading fixtures...'))
-        try:
-            call_command('loaddata', 'users.json')       # 1 superuser and 5 owners
-            call_command('loaddata', 'partners.json')    # 5 partners
-            call_command('loaddata', 'branches.json')    # 11 total branches: 3,3,1,2,2 (for each partner)
-            call_command('loaddata', 'employees.json')   # 25 total employees: 5 for each partner
-            call_command('loaddata', 'categories.json')  # 5 total categories: 3 main ones, 2 subcategories
-            call_command('loaddata', 'courses.json')     # 4 courses
-            call_command('loaddata', "lessons.json")     # 12 total lessons: 3 for each course
-        except Exception as e:
-            raise CommandError(f'Failed to load fixtures: {e}')
-
-
-
-        self.stdout.write(self.style.SUCCESS('Setting hashed passwords and groups for users...'))
-
-        superuser = User.objects.get(email="superuser@gmail.com")
-        superuser.groups.add(superuser_group)
-        superuser.set_password('superuser')
-        superuser.save()
-
-        owner_emails = [f"owner{partner}@gmail.com" for partner in range(1,6)]
-        for email in owner_emails:
-            owner = User.objects.get(email=email)
-            owner.groups.add(owner_group)
-            owner.set_password(email.split('@')[0])  # password is the email prefix (e.g., 'owner1')
-            owner.save()
-
-        teacher_emails = [f"teacher{partner}{num}@gmail.com" for partner in range(1, 6) for num in range(1, 6)]
-        for email in teacher_emails:
-            teacher = User.objects.get(email=email)
-            teacher.groups.add(teacher_group)
-            teacher.set_password(email.split('@')[0])  # password is the email prefix (e.g., 'teacher11')
-            teacher.save()
-
-
-
-        self.stdout.write(self.style.SUCCESS('Setting categories for courses...'))
-
-        roblox_course = Course.objects.get(name="Курс по Roblox")
-        pencilcode_course = Course.objects.get(name="Курс по Pencil Code")
-        python_course = Course.objects.get(name="Курс по Python")
-        js_course = Course.objects.get(name="Курс по JavaScript")
-
-        mb_category = Category.objects.get(name="Mbyte")
-        gb_category = Category.objects.get(name="Gbyte")
-        tb_category = Category.objects.get(name="Tbyte")
-        python_subcategory = Category.objects.get(name="Python")
-        js_subcategory = Category.objects.get(name="JavaScript")
-
-        roblox_course.categories.add(mb_category)
-        pencilcode_course.categories.add(gb_category)
-        python_course.categories.add(tb_category, python_subcategory)
-        js_course.categories.add(tb_category, js_subcategory)
-
-
-
-        self.stdout.write(self.style.SUCCESS('Setting random courses for teachers...'))
-        
-        all_courses = [roblox_course, pencilcode_course, python_course, js_course]
-        teachers = Employee.objects.all()
-        for teacher in teachers:
-            num_courses = random.randint(1, len(all_courses))
-            courses_to_assign = random.sample(all_courses, num_courses)
-            teacher.courses.set(courses_to_assign)
-
-
-        
-        self.stdout.write(self.style.SUCCESS(
-            'Setting a few files for lessons of Roblox course, image for this course and for teachers "teacher11" and "teacher12"...')
-        )
-
-        roblox_course.image = upload_file_to_minio("test_files/roblox_logo.png", "course_images/roblox_logo.png")
-        roblox_course.save()
-
-        roblox_lesson_1 = Lesson.objects.get(Q(lesson_number=1) & Q(course=roblox_course))
-        roblox_lesson_1.presentation = upload_file_to_minio(
-            "test_files/roblox_lesson_1.pptx", 
-            f"{roblox_course.name}/roblox_lesson_1.pptx"
-        )
-        roblox_lesson_1.additional_file = upload_file_to_minio(
-            "test_files/additional_files_lesson_1.zip",
-            f"{roblox_course.name}/additional_files_lesson_1.zip"
-        )
-        roblox_lesson_1.save()
-
-        roblox_lesson_2 = Lesson.objects.get(Q(lesson_number=2) & Q(course=roblox_course))
-        roblox_lesson_2.presentation = upload_file_to_minio(
-            "test_files/roblox_lesson_2.pptx", 
-            f"{roblox_course.name}/roblox_lesson_2.pptx"
-        )
-        roblox_lesson_2.additional_file = upload_file_to_minio(
-            "test_files/additional_files_lesson_2.zip",
-            f"{roblox_course.name}/additional_files_lesson_2.zip"
-        )
-        roblox_lesson_2.save()
-
-        roblox_lesson_3 = Lesson.objects.get(Q(lesson_number=3) & Q(course=roblox_course))
-        roblox_lesson_3.presentation = upload_file_to_minio(
-            "test_files/roblox_lesson_3.pptx", 
-            f"{roblox_course.name}/roblox_lesson_3.pptx"
-        )
-        roblox_lesson_3.additional_file = upload_file_to_minio(
-            "test_files/additional_files_lesson_1.zip",
-            f"{roblox_course.name}/additional_files_lesson_3.zip"
-        )
-        roblox_lesson_3.save()
-
-        teacher11 = User.objects.get(email="teacher11@gmail.com")
-        teacher11.image = upload_file_to_minio("test_files/user_logo.png", "user_images/user_logo.png")
-        teacher11.save()
-
-        teacher12 = User.objects.get(email="teacher12@gmail.com")
-        teacher12.image = upload_file_to_minio("test_files/user_logo2.png", "user_images/user_logo2.png")
-        teacher12.save()
-
-        
+        # everything after migrations is committed once
+        with transaction.atomic():
+            self.stdout.write(self.style.SUCCESS('Loading groups and setting permissions...'))
+            try:
+                bulk_loaddata('groups.json')  # 3 groups: superuser, owner, teacher
+                call_command('fill_groups')
+            except Exception as e:
+                raise CommandError(f'Failed to load groups and fill them with permissions: {e}')
+
+            superuser_group = Group.objects.get(name="superuser")
+            owner_group = Group.objects.get(name="owner")
+            teacher_group = Group.objects.get(name="teacher")
+
+
+            self.stdout.write(self.style.SUCCESS('Loading fixtures...'))
+            try:
+                bulk_loaddata(
+                    'users.json',       # 1 superuser and 5 owners
+                    'partners.json',    # 5 partners
+                    'branches.json',    # 11 total branches: 3,3,1,2,2 (for each partner)
+                    'employees.json',   # 25 total employees: 5 for each partner
+                    'categories.json',  # 5 total categories: 3 main ones, 2 subcategories
+                    'courses.json',     # 4 courses
+                    'lessons.json',     # 12 total lessons: 3 for each course
+                )
+            except Exception as e:
+                raise CommandError(f'Failed to load fixtures: {e}')
+
+
+
+            self.stdout.write(self.style.SUCCESS('Setting hashed passwords and groups for users...'))
+
+            owner_emails = [f"owner{partner}@gmail.com" for partner in range(1,6)]
+            teacher_emails = [f"teacher{partner}{num}@gmail.com" for partner in range(1, 6) for num in range(1, 6)]
+            users = User.objects.in_bulk(["superuser@gmail.com"] + owner_emails + teacher_emails, field_name='email')
+
+            # password is the email prefix (e.g., 'owner1', 'teacher11')
+            # PBKDF2 releases the GIL while hashing, so the passwords are hashed concurrently
+            with ThreadPoolExecutor() as executor:
+                hashes = executor.map(lambda email: make_password(email.split('@')[0]), users)
+                for user, password in zip(users.values(), hashes):
+                    user.password = password
+
+            User.objects.bulk_update(users.values(), ['password'])
+
+            UserGroup = User.groups.through
+            UserGroup.objects.bulk_create(
+                [UserGroup(user=users["superuser@gmail.com"], group=superuser_group)]
+                + [UserGroup(user=users[email], group=owner_group) for email in owner_emails]
+                + [UserGroup(user=users[email], group=teacher_group) for email in teacher_emails],
+                ignore_conflicts=True
+            )
+
+
+
+            self.stdout.write(self.style.SUCCESS('Setting categories for courses...'))
+
+            courses = {
+                course.name: course 
+                for course in Course.objects.filter(
+                    name__in=["Курс по Roblox", "Курс по Pencil Code", "Курс по Python", "Курс по JavaScript"]
+                )
+            }
+            roblox_course = courses["Курс по Roblox"]
+            pencilcode_course = courses["Курс по Pencil Code"]
+            python_course = courses["Курс по Python"]
+            js_course = courses["Курс по JavaScript"]
+
+            categories = Category.objects.in_bulk(["Mbyte", "Gbyte", "Tbyte", "Python", "JavaScript"], field_name='name')
+            mb_category = categories["Mbyte"]
+            gb_category = categories["Gbyte"]
+            tb_category = categories["Tbyte"]
+            python_subcategory = categories["Python"]
+            js_subcategory = categories["JavaScript"]
+
+            CourseCategory = Course.categories.through
+            CourseCategory.objects.bulk_create(
+                [
+                    CourseCategory(course=course, category=category) 
+                    for course, category in (
+                        (roblox_course, mb_category),
+                        (pencilcode_course, gb_category),
+                        (python_course, tb_category),
+                        (python_course, python_subcategory),
+                        (js_course, tb_category),
+                        (js_course, js_subcategory),
+                    )
+                ],
+                ignore_conflicts=True
+            )
+
+
+
+            self.stdout.write(self.style.SUCCESS('Setting random courses for teachers...'))
+
+            all_courses = [roblox_course, pencilcode_course, python_course, js_course]
+            EmployeeCourse = Employee.courses.through
+            EmployeeCourse.objects.bulk_create(
+                [
+                    EmployeeCourse(employee_id=teacher_id, course=course)
+                    for teacher_id in Employee.objects.values_list('pk', flat=True)
+                    for course in random.sample(all_courses, random.randint(1, len(all_courses)))
+                ],
+                ignore_conflicts=True
+            )
+
+
+
+            self.stdout.write(self.style.SUCCESS(
+                'Setting a few files for lessons of Roblox course, image for this course and for teachers "teacher11" and "teacher12"...')
+            )
+
+            roblox_lessons = {
+                lesson.lesson_number: lesson 
+                for lesson in Lesson.objects.filter(course=roblox_course, lesson_number__in=[1, 2, 3])
+            }
+            teacher11 = users["teacher11@gmail.com"]
+            teacher12 = users["teacher12@gmail.com"]
+
+            # (instance, field, local file, storage path)
+            uploads = [
+                (roblox_course, 'image', "test_files/roblox_logo.png", "course_images/roblox_logo.png"),
+                (roblox_lessons[1], 'presentation', "test_files/roblox_lesson_1.pptx", f"{roblox_course.name}/roblox_lesson_1.pptx"),
+                (roblox_lessons[1], 'additional_file', "test_files/additional_files_lesson_1.zip", f"{roblox_course.name}/additional_files_lesson_1.zip"),
+                (roblox_lessons[2], 'presentation', "test_files/roblox_lesson_2.pptx", f"{roblox_course.name}/roblox_lesson_2.pptx"),
+                (roblox_lessons[2], 'additional_file', "test_files/additional_files_lesson_2.zip", f"{roblox_course.name}/additional_files_lesson_2.zip"),
+                (roblox_lessons[3], 'presentation', "test_files/roblox_lesson_3.pptx", f"{roblox_course.name}/roblox_lesson_3.pptx"),
+                (roblox_lessons[3], 'additional_file', "test_files/additional_files_lesson_1.zip", f"{roblox_course.name}/additional_files_lesson_3.zip"),
+                (teacher11, 'image', "test_files/user_logo.png", "user_images/user_logo.png"),
+                (teacher12, 'image', "test_files/user_logo2.png", "user_images/user_logo2.png"),
+            ]
+
+            # uploads wait on the network, so they are sent to the storage concurrently
+            with ThreadPoolExecutor(max_workers=len(uploads)) as executor:
+                stored_names = executor.map(lambda upload: upload_file_to_minio(upload[2], upload[3]), uploads)
+                for (instance, field, _, _), stored_name in zip(uploads, stored_names):
+                    setattr(instance, field, stored_name)
+
+            # fixture instances have no previous files, so the custom `save` methods are not needed
+            Course.objects.bulk_update([roblox_course], ['image'])
+            Lesson.objects.bulk_update(roblox_lessons.values(), ['presentation', 'additional_file'])
+            User.objects.bulk_update([teacher11, teacher12], ['image'])
+
+
 
         self.stdout.write(self.style.SUCCESS('Successfully set up the database!'))
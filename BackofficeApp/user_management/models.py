@@ -1,7 +1,10 @@
 import uuid
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
-from django.core.files.storage import default_storage
+from django.db.models.functions import Upper
+from django.utils.functional import cached_property
 from django.contrib.auth.models import AbstractUser, Group, BaseUserManager
+from BackofficeApp.files import delete_files_on_commit, update_fields_except, remember_file_names, stored_file_names
 
 from django.utils.translation import gettext_lazy as _
 
@@ -14,16 +17,21 @@ class CustomUserManager(BaseUserManager):
             Private method that creates and saves a User with the given email, password, and extra fields.
         create_user:
             Creates a regular user with the specified email, password, and additional non-sensitive fields.
+        bulk_create_users:
+            Creates regular users in bulk with a single INSERT per batch.
+        get_by_natural_key:
+            Retrieves a user by email regardless of it's case.
         create_superuser:
             Creates a superuser with the specified email, password, and extra fields.
     """
-    def _create_user(self, email, password, **extra_fields):
+    def _create_user(self, email, password, commit=True, **extra_fields):
         """
         Private method that creates and saves a User with the given email, password, and extra fields.
 
         Args:
             email (str): User's email.
             password (str): User's password.
+            commit (bool): If False, the user isn't saved, e.g. to be inserted later with `bulk_create`.
             **extra_fields (dict): Extra fields to include in the User model.
 
         Returns:
@@ -37,7 +45,8 @@ class CustomUserManager(BaseUserManager):
         email = email.lower()
         user = self.model(email=email, **extra_fields)
         user.set_password(password)
-        user.save(using=self._db)
+        if commit:
+            user.save(using=self._db)
         return user
 
     def create_user(self, email, password=None, **extra_fields):
@@ -56,6 +65,36 @@ class CustomUserManager(BaseUserManager):
         extra_fields.setdefault("is_superuser", False)
         return self._create_user(email, password, **extra_fields)
 
+    def bulk_create_users(self, users_data, batch_size=None):
+        """
+        Creates regular users in bulk, prepared the same way as in `create_user`
+            and inserted with a single INSERT per batch. <br>
+        `save` and signals aren't called for the created users.
+
+        Args:
+            users_data (list): Dicts with email, password and additional fields of each user.
+            batch_size (int): Maximum number of users in one INSERT.
+
+        Returns:
+            (list): The created user instances with primary keys.
+        """
+        users = [self.create_user(commit=False, **user_data) for user_data in users_data]
+        return self.bulk_create(users, batch_size=batch_size)
+
+    def get_by_natural_key(self, username):
+        """
+        Retrieves a user by email regardless of it's case, used by authentication backends on login. <br>
+        Emails are stored lowercased, so the given email is lowercased
+            and the lookup stays an exact match on the unique email index instead of `iexact`.
+
+        Args:
+            username (str): User's email.
+
+        Returns:
+            (User): The user with the email.
+        """
+        return super().get_by_natural_key(username.lower())
+
     def create_superuser(self, email, password=None, **extra_fields):
         """
         Creates a superuser with the specified email, password, and extra fields.
@@ -158,6 +197,8 @@ class User(AbstractUser):
 
     Methods:
         __str__: Returns the string representation of the user's email.
+        group_names: Names of the user's groups, fetched once per user instance.
+        from_db: Creates an instance from a database row and remembers the name of it's image.
         save: Custom save method to handle image update.
         delete: Custom delete method to handle image deletion if the user is deleted.
     """
@@ -200,6 +241,22 @@ class User(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        """
+        Indexes for the search of employees.
+
+        Attributes:
+            indexes (List): 
+                GIN trigram indexes on `UPPER()` of the name fields and email, 
+                    the expressions Postgres compares in `__icontains` lookups.
+        """
+        indexes = [
+            GinIndex(OpClass(Upper('first_name'), name='gin_trgm_ops'), name='user_first_name_upper_trgm'),
+            GinIndex(OpClass(Upper('last_name'), name='gin_trgm_ops'), name='user_last_name_upper_trgm'),
+            GinIndex(OpClass(Upper('patronymic'), name='gin_trgm_ops'), name='user_patronymic_upper_trgm'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='user_email_upper_trgm'),
+        ]
+
     def __str__(self):
         """
         Returns the string representation of the user.
@@ -208,42 +265,75 @@ class User(AbstractUser):
             email (str): User's email address.
         """
         return self.email
+
+    @cached_property
+    def group_names(self):
+        """
+        Names of the user's groups. <br>
+        Fetched with a single query and cached on the instance, 
+            so repeated group checks during one request don't hit the database.
+
+        Returns:
+            (frozenset): Names of the groups the user belongs to.
+        """
+        return frozenset(self.groups.values_list('name', flat=True))
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Creates an instance from a database row and remembers the name of it's image,
+            so `save` doesn't have to read the row again to compare images.
+
+        Returns:
+            (User): The loaded user.
+        """
+        instance = super().from_db(db, field_names, values)
+        remember_file_names(instance, ['image'])
+        return instance
+
     def save(self, *args, **kwargs):
         """
         Custom save method to handle image update.
-        If new image is provided old one is deleted.
-        If user have an image and on update the new one isn't provided we not rewrite image field with Null value.
+        If new image is provided old one is deleted after the UPDATE succeeds and the transaction is committed.
+        If user have an image and on update the new one isn't provided we not rewrite image field with Null value, 
+            image column is left out of the UPDATE. <br>
+        The old image name is taken from the loaded instance, the row is read only for instances not loaded from the database.
+            Saves with `update_fields` without image skip the image handling.
         """
         is_update = self.pk is not None
+        update_fields = kwargs.get('update_fields')
+        preserved_fields = []
+        replaced_files = []
+
+        if is_update and (update_fields is None or 'image' in update_fields):
+            old_image = stored_file_names(self, ['image'])['image']
+            if old_image and self.image and old_image != self.image.name:
+                replaced_files.append(old_image)
+            if old_image and not self.image:
+                self.image = old_image
+                preserved_fields.append('image')
 
-        if is_update:
-            old_user = User.objects.get(pk=self.pk)
-            if old_user.image and self.image and old_user.image != self.image:
-                default_storage.delete(old_user.image.name)
-            if old_user.image and not self.image:
-                self.image = old_user.image.name.split("/")[-1]
+        if preserved_fields and update_fields is None:
+            kwargs['update_fields'] = update_fields_except(self, preserved_fields)
 
         super().save(*args, **kwargs)
+        delete_files_on_commit(replaced_files)
+        if update_fields is None or 'image' in update_fields:
+            remember_file_names(self, ['image'])
 
     def delete(self, *args, **kwargs):
         """
-        Custom delete method to handle image deletion if the user is deleted.
+        Custom delete method to handle image deletion if the user is deleted. <br>
+        The image is deleted from the storage in background after the transaction is committed.
 
         Args:
             args (tuple): Positional arguments.
             kwargs (dict): Keyword arguments.
-
-        Raises:
-            Exception: If an error occurs during image deletion from storage.
         """
-        if self.image:
-            try:
-                default_storage.delete(self.image.name)
-            except Exception as e:
-                print(f"Error deleting image from S3: {e}")
+        image_name = self.image.name if self.image else None
 
         super(User, self).delete(*args, **kwargs)
+        delete_files_on_commit([image_name])
 
 
 class GroupDescription(models.Model):
@@ -1,13 +1,35 @@
 from django.contrib.auth.models import Group, Permission
+from django.db.models import Subquery
 from rest_framework import serializers
-from rest_framework.utils import model_meta
 from drf_writable_nested.mixins import UniqueFieldsMixin
 from drf_writable_nested.serializers import WritableNestedModelSerializer
-from django.utils.translation import gettext_lazy as _
+from django.utils.translation import gettext, gettext_lazy as _
 
+from BackofficeApp.serializers import CachedFieldsMixin
 from .models import User, GroupDescription
 
 
+# Translatable labels of the genders, translated to the request language on `str()`.
+user_gender_display = dict(User.Gender.choices)
+
+
+def add_user_to_group(user, group_name):
+    """
+    Adds the user to the group with the given name. <br>
+    The group id is selected inside the INSERT, so the group isn't fetched beforehand 
+        and the group names are always resolved against the current groups.
+
+    Args:
+        user (User): The user to add.
+        group_name (str): Name of the group.
+    """
+    UserGroup = User.groups.through
+    UserGroup.objects.create(
+        user=user, 
+        group_id=Subquery(Group.objects.filter(name=group_name).values('pk')[:1])
+    )
+
+
 #class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
 #    def validate(self, attrs):
 #        data = super().validate(attrs)
@@ -25,7 +47,7 @@ from .models import User, GroupDescription
         
 #        return token
     
-class UserSerializer(UniqueFieldsMixin, serializers.ModelSerializer):
+class UserSerializer(UniqueFieldsMixin, CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for User model with unique field handling (UniqueFieldsMixin) that includes custom validation for groups.
 
@@ -89,7 +111,7 @@ class UserSerializer(UniqueFieldsMixin, serializers.ModelSerializer):
     def create(self, validated_data):
         """
         Creates a new User instance using the provided validated data.  <br>
-        This method manages many-to-many relations, specifically for 'groups'. It ensures that if a user is assigned
+        The user is added to the group from the 'group' field. It ensures that if a user is assigned
         to the 'superuser' group, the 'is_superuser' flag is set to True. Other User fields are set from 'validated_data'.
 
         Args:
@@ -98,16 +120,6 @@ class UserSerializer(UniqueFieldsMixin, serializers.ModelSerializer):
         Returns:
             (User): Newly created User instance.
         """
-        ModelClass = self.Meta.model
-
-        info = model_meta.get_field_info(ModelClass)
-        many_to_many = {}
-        for field_name, relation_info in info.relations.items():
-            if relation_info.to_many and (field_name in validated_data):
-                many_to_many[field_name] = validated_data.pop(field_name)
-                #if field_name == "groups" and Group.objects.get(name='superuser') in many_to_many[field_name]:
-                #    validated_data['is_superuser'] = True
-
         group_name = validated_data.pop('group', None)
         if group_name and group_name == 'superuser':
             validated_data['is_superuser'] = True
@@ -115,21 +127,17 @@ class UserSerializer(UniqueFieldsMixin, serializers.ModelSerializer):
         instance = User.objects.create_user(**validated_data)
 
         if group_name:
-            instance.groups.add(Group.objects.get(name=group_name))
-
-        if many_to_many:
-            for field_name, value in many_to_many.items():
-                field = getattr(instance, field_name)
-                field.set(value)
+            add_user_to_group(instance, group_name)
 
         return instance
     
     def update(self, instance, validated_data):
         """
         Update an existing User instance. <br>
-        Manages updates to many-to-many fields and ensures proper handling of user privileges based on group membership.
+        Replaces the user's group and ensures proper handling of user privileges based on group membership.
         If the user is part of the 'superuser' group, the 'is_superuser' attribute is updated accordingly. Email changes
-        are normalized to lowercase and passwords are set securely. Other fields are updated based on 'validated_data'.
+        are normalized to lowercase and passwords are set securely. Other fields are updated based on 'validated_data'. <br>
+        Only the submitted fields are written with `update_fields`.
 
         Args:
             instance (User): The existing User instance to be updated.
@@ -138,12 +146,13 @@ class UserSerializer(UniqueFieldsMixin, serializers.ModelSerializer):
         Returns:
             (User): The updated User instance.
         """
-        info = model_meta.get_field_info(instance)
-        m2m_fields = []
-
         email = validated_data.get('email')
-        if email and email.lower() == instance.email.lower():
-            validated_data.pop('email', None)
+        if email:
+            email = email.lower()
+            if email == instance.email.lower():
+                validated_data.pop('email')
+            else:
+                validated_data['email'] = email
 
         #groups = validated_data.get('groups')
         #if groups:
@@ -156,25 +165,20 @@ class UserSerializer(UniqueFieldsMixin, serializers.ModelSerializer):
         if group_name:
             if group_name == 'superuser':
                 validated_data['is_superuser'] = True
-            instance.groups.clear()
-            instance.groups.add(Group.objects.get(name=group_name))
+            # groups are usually prefetched by the viewset, the rows are rewritten only when the group changes
+            if {group.name for group in instance.groups.all()} != {group_name}:
+                instance.groups.clear()
+                add_user_to_group(instance, group_name)
 
         for attr, value in validated_data.items():
-            if attr in info.relations and info.relations[attr].to_many:
-                m2m_fields.append((attr, value))
+            if attr == 'password':
+                instance.set_password(value)
             else:
-                if attr == 'password':
-                    instance.set_password(value)
-                else:
-                    if attr == 'email':
-                        value = value.lower()
-                    setattr(instance, attr, value)
-                    
-        instance.save()
-
-        for attr, value in m2m_fields:
-            field = getattr(instance, attr)
-            field.set(value)
+                setattr(instance, attr, value)
+
+        # only columns of the submitted fields are written
+        if validated_data:
+            instance.save(update_fields=list(validated_data))
 
         return instance
     
@@ -192,10 +196,11 @@ class UserSerializer(UniqueFieldsMixin, serializers.ModelSerializer):
             (dict): A dictionary representing the serialized User instance.
         """
         representation = super().to_representation(instance)
-        representation['gender'] = instance.get_gender_display()
-        first_group = instance.groups.first()
+        representation['gender'] = str(user_gender_display.get(instance.gender, instance.gender))
+        # same group as groups.first(), but served from prefetch_related('user__groups') when it's used
+        first_group = min(instance.groups.all(), key=lambda group: group.pk, default=None)
         if first_group:
-            representation['group'] = _(first_group.name)
+            representation['group'] = gettext(first_group.name)
         else:
             representation['group'] = None
         #representation['groups'] = [{'id': group.id, 'name': _(group.name)} for group in instance.groups.all()]
@@ -216,7 +221,7 @@ class GroupDescriptionSerializer(serializers.ModelSerializer):
         fields = ['description']
 
 
-class GroupSerializer(WritableNestedModelSerializer):
+class GroupSerializer(CachedFieldsMixin, WritableNestedModelSerializer):
     """
     Serializer for Group model with nested GroupDescription serialization.
 
@@ -254,7 +259,7 @@ class GroupSerializer(WritableNestedModelSerializer):
             (dict): A dictionary representing the serialized Group instance.
         """
         representation = super().to_representation(instance)
-        representation['name'] = _(instance.name)
+        representation['name'] = gettext(instance.name)
         representation['permissions'] = [str(permission) for permission in instance.permissions.all()]
         return representation
 
@@ -1,3 +1,35 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.db import IntegrityError
+from django.test import TransactionTestCase
+
+from .models import User
+from BackofficeApp.files import _delete_files_in_background
+
+
+@mock.patch('BackofficeApp.files._storage_executor')
+class UserImageReplacementTests(TransactionTestCase):
+    """
+    Tests of user image replacement in autocommit mode, as the views run without `ATOMIC_REQUESTS`.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user('user@gmail.com', image='user_images/old.png')
+
+    def test_deletes_replaced_image_after_update(self, executor):
+        user = User.objects.get(pk=self.user.pk)
+        user.image = 'user_images/new.png'
+
+        user.save()
+
+        executor.submit.assert_called_once_with(_delete_files_in_background, ['user_images/old.png'])
+
+    def test_keeps_replaced_image_when_update_fails(self, executor):
+        user = User.objects.get(pk=self.user.pk)
+        user.image = 'user_images/new.png'
+        user.email = None
+
+        with self.assertRaises(IntegrityError):
+            user.save()
+
+        self.assertEqual(User.objects.get(pk=self.user.pk).image.name, 'user_images/old.png')
+        executor.submit.assert_not_called()
@@ -1,16 +1,19 @@
-from datetime import datetime
-
 from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import Group, Permission
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework import permissions
+from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 
+from BackofficeApp.renderers import ORJSONRenderer
 from .models import User
 from .serializers import GroupSerializer, UserSerializer, PermissionSerializer
 
@@ -44,8 +47,10 @@ class CustomTokenObtainPairView(TokenObtainPairView):
         response = super().post(request, *args, **kwargs)
         tokens = response.data
         
-        access_expiration = datetime.now() + settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']
-        refresh_expiration = datetime.now() + settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME']
+        # aware UTC time, naive datetimes are taken as UTC by `set_cookie`
+        now = timezone.now()
+        access_expiration = now + settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']
+        refresh_expiration = now + settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME']
         
         response.set_cookie(
             key='access_token',
@@ -107,7 +112,7 @@ class CustomTokenRefreshView(TokenRefreshView):
             response = super().post(request, *args, **kwargs)
             tokens = response.data
 
-            access_expiration = datetime.now() + settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']
+            access_expiration = timezone.now() + settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']
             
             response.set_cookie(
                 key='access_token',
@@ -198,14 +203,39 @@ class UserViewSet(viewsets.ModelViewSet):
     Viewset to manage users.
 
     Attributes:
-        queryset (QuerySet): Users ordered by the date they joined.
+        queryset (QuerySet): Users ordered by the date they joined. <br>
+            Groups are prefetched for the group in the representation.
         serializer_class (ModelSerializer): `UserSerializer`.
         parser_classes (tuple): Parsers for JSON, multipart, and form data.
+
+    Methods:
+        export: Streams all users as newline delimited JSON.
     """
-    queryset = User.objects.all().order_by('-date_joined')
+    queryset = User.objects.prefetch_related(
+        Prefetch('groups', queryset=Group.objects.only('id', 'name'))
+    ).order_by('-date_joined')
     serializer_class = UserSerializer
     parser_classes = (JSONParser, MultiPartParser, FormParser)
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Streams all users without pagination as newline delimited JSON, one user per line. <br>
+        Users are read from the database in chunks of 1000 with their groups prefetched per chunk, 
+            so memory use doesn't grow with the number of users and the first lines are sent right away.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            (StreamingHttpResponse): 200 HTTP response with `application/x-ndjson` content.
+        """
+        serializer = self.get_serializer()
+        renderer = ORJSONRenderer()
+        users = self.filter_queryset(self.get_queryset()).iterator(chunk_size=1000)
+        lines = (renderer.render(serializer.to_representation(user)) + b'\n' for user in users)
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+
 
 class GroupPermissionsView(APIView):
     """
@@ -232,16 +262,23 @@ class GroupPermissionsView(APIView):
                 200 HTTP response if successful. Contains the group, permissions, partner_id for the logged-in user. <br>
                 404 HTTP response if the user is not part of any group.
         """
-        user_group = request.user.groups.first()
-        if user_group:
+        # group and codenames of it's permissions in one query, a row per permission
+        rows = list(request.user.groups.order_by(
+            'pk', 
+            'permissions__content_type__app_label', 
+            'permissions__content_type__model', 
+            'permissions__codename'
+        ).values_list('pk', 'name', 'permissions__codename'))
+        if rows:
+            group_id, group_name, _ = rows[0]
             partner_id = None
-            if user_group.name == 'owner':
-                partner_id = request.user.owned_partner.id
-            elif user_group.name == 'teacher':
-                partner_id = request.user.employee.partner.id
+            if group_name == 'owner':
+                partner_id = request.user.owned_partner.pk
+            elif group_name == 'teacher':
+                partner_id = request.user.employee.partner_id
             data = {
-                'group_name': user_group.name,
-                'permissions': [perm.codename for perm in user_group.permissions.all()],
+                'group_name': group_name,
+                'permissions': [codename for pk, _, codename in rows if pk == group_id and codename is not None],
                 'partner_id': partner_id,
             }
             return Response(data, status=status.HTTP_200_OK)
@@ -254,10 +291,13 @@ class GroupViewSet(viewsets.ModelViewSet):
     Viewset to manage groups.
 
     Attributes:
-        queryset (Queryset)): Groups ordered by their name.
+        queryset (Queryset)): Groups ordered by their name. <br>
+            Description is joined, permissions are prefetched joined with their content types for the representation.
         serializer_class (ModelSerializer): `GroupSerializer`.
     """
-    queryset = Group.objects.all().order_by('name')
+    queryset = Group.objects.select_related('description').prefetch_related(
+        Prefetch('permissions', queryset=Permission.objects.select_related('content_type'))
+    ).order_by('name')
     serializer_class = GroupSerializer
 
 